@@ -5,7 +5,6 @@ import asyncio
 import copy
 import hashlib
 import os
-import re
 import string
 import sys
 import typing
@@ -35,9 +34,11 @@ except ImportError:
 
 from core import checks
 from core.changelog import Changelog
+from core.checks import PermissionIndex
 from core.clients import ApiClient, MongoDBClient, PluginDatabaseClient
 from core.config import ConfigManager
 from core.models import (
+    Default,
     DMDisabled,
     HostingMethod,
     InvalidConfigError,
@@ -46,9 +47,11 @@ from core.models import (
     configure_logging,
     getLogger,
 )
+from core.notifications import Notifications
 from core.thread import ThreadManager
 from core.time import human_timedelta
-from core.utils import human_join, normalize_alias, parse_alias, truncate, tryint
+from core.triggers import AutoTriggerMatcher
+from core.utils import SuggestionIndex, compile_alias, human_join, normalize_alias, truncate, tryint
 
 logger = getLogger(__name__)
 
@@ -70,6 +73,12 @@ class ModmailBot(commands.Bot):
     def __init__(self):
         self.config = ConfigManager(self)
         self.config.populate_cache()
+        # built from the permission configs on first use, see `permission_index`
+        self._permission_index = None
+        self._auto_trigger_matcher = None
+        self._suggestion_indexes = {}
+        # author id -> future of the author's latest DM, done once it's queued in its thread
+        self._dm_arrivals = {}
 
         intents = discord.Intents.all()
         if not self.config["enable_presence_intent"]:
@@ -90,11 +99,13 @@ class ModmailBot(commands.Bot):
         if not os.path.exists(log_dir):
             os.mkdir(log_dir)
         self.log_file_path = os.path.join(log_dir, "modmail.log")
+        self.thread_snapshot_path = os.path.join(temp_dir, "thread_cache.json")
         configure_logging(self)
 
         self.plugin_db = PluginDatabaseClient(self)  # Deprecated
 
         self.blocklist = Blocklist(bot=self)
+        self.notifications = Notifications(bot=self)
 
         self.startup()
 
@@ -124,7 +135,7 @@ class ModmailBot(commands.Bot):
             return name
 
         try:
-            (command,) = parse_alias(self.aliases[name])
+            (command,) = compile_alias(self.aliases[name])
         except (KeyError, ValueError):
             # There is either no alias by this name present or the
             # alias has multiple steps.
@@ -209,9 +220,13 @@ class ModmailBot(commands.Bot):
         # deprecated
         return self.api.db
 
-    async def get_prefix(self, message=None):
+    @property
+    def prefixes(self) -> typing.List[str]:
         return [self.prefix, f"<@{self.user.id}> ", f"<@!{self.user.id}> "]
 
+    async def get_prefix(self, message=None):
+        return self.prefixes
+
     def run(self):
         async def runner():
             async with self:
@@ -372,6 +387,38 @@ class ModmailBot(commands.Bot):
     def auto_triggers(self) -> typing.Dict[str, str]:
         return self.config["auto_triggers"]
 
+    def suggestion_index(self, kind: str) -> SuggestionIndex:
+        """
+        The index of the names of a kind, to suggest names for misspellings and autocompletion.
+
+        `kind` is one of "snippets", "aliases", "auto_triggers", "commands" or "config",
+        the index is synced with the current names every time it's retrieved.
+        """
+        if kind == "commands":
+            words = {cmd.qualified_name for cmd in self.walk_commands() if not cmd.hidden}
+        elif kind == "config":
+            words = self.config.public_keys.keys() | self.config.protected_keys.keys()
+        else:
+            words = self.config[kind].keys()
+
+        index = self._suggestion_indexes.get(kind)
+        if index is None:
+            index = self._suggestion_indexes[kind] = SuggestionIndex(words)
+        else:
+            index.sync(words)
+        return index
+
+    @property
+    def auto_trigger_matcher(self) -> AutoTriggerMatcher:
+        regex = self.config.get("use_regex_autotrigger")
+        if self._auto_trigger_matcher is None or self._auto_trigger_matcher.regex != regex:
+            self._auto_trigger_matcher = AutoTriggerMatcher(self.auto_triggers, regex)
+        return self._auto_trigger_matcher
+
+    def invalidate_auto_triggers(self) -> None:
+        """Compiles the auto triggers again on next use, call it after adding or removing one."""
+        self._auto_trigger_matcher = None
+
     @property
     def token(self) -> str:
         token = self.config["token"]
@@ -482,14 +529,35 @@ class ModmailBot(commands.Bot):
     def error_color(self) -> int:
         return self.config.get("error_color")
 
+    @property
+    def permission_index(self) -> PermissionIndex:
+        if self._permission_index is None:
+            self._permission_index = PermissionIndex(self.config)
+        return self._permission_index
+
+    def invalidate_permissions(self) -> None:
+        """Rebuilds the permission index on next use, call it after changing the permission configs."""
+        self._permission_index = None
+
+    def forget_permission_decisions(self, user_id: typing.Optional[int] = None) -> None:
+        """Forgets the cached permission decisions of a user, or all of them if `user_id` is None."""
+        if self._permission_index is not None:
+            self._permission_index.forget_decisions(user_id)
+
+    def add_command(self, command, /) -> None:
+        super().add_command(command)
+        # the default permission level of a command comes from its checks
+        self.forget_permission_decisions()
+
+    def remove_command(self, name, /):
+        command = super().remove_command(name)
+        self.forget_permission_decisions()
+        return command
+
     def command_perm(self, command_name: str) -> PermissionLevel:
-        level = self.config["override_command_level"].get(command_name)
+        level = self.permission_index.overrides.get(command_name)
         if level is not None:
-            try:
-                return PermissionLevel[level.upper()]
-            except KeyError:
-                logger.warning("Invalid override_command_level for command %s.", command_name)
-                self.config["override_command_level"].pop(command_name)
+            return level
 
         command = self.get_command(command_name)
         if command is None:
@@ -513,8 +581,11 @@ class ModmailBot(commands.Bot):
 
         logger.debug("Connected to gateway.")
         await self.config.refresh()
+        self.invalidate_permissions()
+        self.invalidate_auto_triggers()
         await self.api.setup_indexes()
         await self.blocklist.setup()
+        await self.notifications.setup()
         await self.load_extensions()
         self._connected.set()
 
@@ -566,38 +637,25 @@ class ModmailBot(commands.Bot):
 
         await self.threads.populate_cache()
 
-        # closures
-        closures = self.config["closures"]
-        logger.info("There are %d thread(s) pending to be closed.", len(closures))
+        # closures used to be stored in the config
+        legacy_closures = self.config["closures"]
+        if legacy_closures:
+            logger.info("Moving %d closure(s) out of the config.", len(legacy_closures))
+            for recipient_id, items in legacy_closures.items():
+                items = {**items, "time": datetime.fromisoformat(items["time"]).astimezone(timezone.utc)}
+                await self.api.update_closure(recipient_id, items)
+            self.config.remove("closures")
+            await self.config.flush()
+
+        # only closures that are due soon get a timer now, the rest are scheduled by `schedule_closures`
+        closures = {c["recipient_id"]: c for c in await self.api.get_closures(auto_close=False)}
+        for closure in await self.api.get_closures(due_before=discord.utils.utcnow() + timedelta(minutes=2)):
+            closures[closure["recipient_id"]] = closure
+        logger.info("There are %d thread(s) pending to be closed soon.", len(closures))
         logger.line()
 
-        for recipient_id, items in tuple(closures.items()):
-            after = (
-                datetime.fromisoformat(items["time"]).astimezone(timezone.utc) - discord.utils.utcnow()
-            ).total_seconds()
-            if after <= 0:
-                logger.debug("Closing thread for recipient %s.", recipient_id)
-                after = 0
-            else:
-                logger.debug("Thread for recipient %s will be closed after %s seconds.", recipient_id, after)
-
-            thread = await self.threads.find(recipient_id=int(recipient_id))
-
-            if not thread:
-                # If the channel is deleted
-                logger.debug("Failed to close thread for recipient %s.", recipient_id)
-                self.config["closures"].pop(recipient_id)
-                await self.config.update()
-                continue
-
-            await thread.close(
-                closer=await self.get_or_fetch_user(items["closer_id"]),
-                after=after,
-                silent=items["silent"],
-                delete_channel=items["delete_channel"],
-                message=items["message"],
-                auto_close=items.get("auto_close", False),
-            )
+        for closure in closures.values():
+            await self.restore_closure(closure)
 
         for log in await self.api.get_open_logs():
             if self.get_channel(int(log["channel_id"])) is None:
@@ -634,8 +692,21 @@ class ModmailBot(commands.Bot):
 
         self.autoupdate.start()
         self.log_expiry.start()
+        self.save_thread_snapshot.start()
+        self.schedule_closures.start()
         self._started = True
 
+    async def close(self):
+        if self._started:
+            # only write once the cache was populated, or we'd clobber the last snapshot
+            self.threads.save_snapshot()
+        if self.config.ready_event.is_set():
+            try:
+                await self.config.flush()
+            except Exception:
+                logger.error("Failed to save the config.", exc_info=True)
+        await super().close()
+
     async def convert_emoji(self, name: str) -> str:
         ctx = SimpleNamespace(bot=self, guild=self.modmail_guild)
         converter = commands.EmojiConverter()
@@ -853,13 +924,15 @@ class ModmailBot(commands.Bot):
         if thread_cooldown == isodate.Duration():
             return
 
-        last_log = await self.api.get_latest_user_logs(author.id)
-
-        if last_log is None:
-            logger.debug("Last thread wasn't found, %s.", author.name)
-            return
+        last_log_closed_at = self.threads.get_last_closed_at(author.id)
+        if last_log_closed_at is Default:
+            last_log = await self.api.get_latest_user_logs(author.id)
+            last_log_closed_at = last_log.get("closed_at") if last_log is not None else None
+            self.threads.cache_last_closed_at(author.id, last_log_closed_at)
 
-        last_log_closed_at = last_log.get("closed_at")
+            if last_log is None:
+                logger.debug("Last thread wasn't found, %s.", author.name)
+                return
 
         if not last_log_closed_at:
             logger.debug("Last thread was not closed, %s.", author.name)
@@ -894,6 +967,30 @@ class ModmailBot(commands.Bot):
 
     async def process_dm_modmail(self, message: discord.Message) -> None:
         """Processes messages sent to the bot."""
+        # the place of the message is taken on arrival, it's relayed to its thread
+        # after the messages the author sent before it
+        previous = self._dm_arrivals.get(message.author.id)
+        arrived = self.loop.create_future()
+        self._dm_arrivals[message.author.id] = arrived
+        try:
+            await self._process_dm_modmail(message, previous, arrived)
+        finally:
+
+            def release(_=None):
+                if not arrived.done():
+                    arrived.set_result(None)
+                if self._dm_arrivals.get(message.author.id) is arrived:
+                    del self._dm_arrivals[message.author.id]
+
+            # if it wasn't relayed, the next message still waits for the ones before this one
+            if previous is None or previous.done():
+                release()
+            else:
+                previous.add_done_callback(release)
+
+    async def _process_dm_modmail(
+        self, message: discord.Message, previous: typing.Optional[asyncio.Future], arrived: asyncio.Future
+    ) -> None:
         blocked = await self._process_blocked(message)
         if blocked:
             return
@@ -946,20 +1043,35 @@ class ModmailBot(commands.Bot):
                 return await message.channel.send(embed=embed)
 
         if not thread.cancelled:
-            try:
-                await thread.send(message)
-            except Exception:
-                logger.error("Failed to send message:", exc_info=True)
-                await self.add_reaction(message, blocked_emoji)
-            else:
+
+            async def send_to_other_recipients():
+                dm_messages = {message.author.id: message}
+                if relayed.cancelled() or relayed.exception() is not None:
+                    return dm_messages
                 for user in thread.recipients:
                     # send to all other recipients
                     if user != message.author:
                         try:
-                            await thread.send(message, user)
+                            dm_messages[user.id] = await thread.send(message, user)
                         except Exception:
                             # silently ignore
                             logger.error("Failed to send message:", exc_info=True)
+                return dm_messages
+
+            if previous is not None:
+                await asyncio.shield(previous)
+            # the sends to the channel and to the other recipients are ordered,
+            # the rest runs alongside the next messages
+            relayed = thread.relay(lambda: thread.send(message))
+            copied = thread.relay(send_to_other_recipients)
+            arrived.set_result(None)
+            try:
+                thread_message = await relayed
+            except Exception:
+                logger.error("Failed to send message:", exc_info=True)
+                await self.add_reaction(message, blocked_emoji)
+            else:
+                thread.link_messages(message, thread_message, await copied)
 
                 await self.add_reaction(message, sent_emoji)
                 self.dispatch("thread_reply", thread, False, message, False, False)
@@ -982,14 +1094,13 @@ class ModmailBot(commands.Bot):
 
         view = StringView(message.content)
         ctx = cls(prefix=self.prefix, view=view, bot=self, message=message)
-        thread = await self.threads.find(channel=ctx.channel)
+        # resolved once per message, the contexts of alias steps share it
+        ctx.thread = await self.threads.find(channel=ctx.channel)
 
         if message.author.id == self.user.id:  # type: ignore
             return [ctx]
 
-        prefixes = await self.get_prefix()
-
-        invoked_prefix = discord.utils.find(view.skip_string, prefixes)
+        invoked_prefix = discord.utils.find(view.skip_string, self.prefixes)
         if invoked_prefix is None:
             return [ctx]
 
@@ -1021,23 +1132,17 @@ class ModmailBot(commands.Bot):
                     command_invocation_text = alias
                 else:
                     command = self._get_snippet_command()
-                    command_invocation_text = f"{invoked_prefix}{command} {snippet_text}"
-                view = StringView(invoked_prefix + command_invocation_text)
-                ctx_ = cls(prefix=self.prefix, view=view, bot=self, message=message)
-                ctx_.thread = thread
-                discord.utils.find(view.skip_string, prefixes)
-                ctx_.invoked_with = view.get_word().lower()
-                ctx_.command = command or self.all_commands.get(ctx_.invoked_with)
-                ctxs += [ctx_]
+                    command_invocation_text = f"{command} {snippet_text}"
+                ctxs.append(
+                    self._get_step_context(ctx, invoked_prefix, command_invocation_text, command, cls=cls)
+                )
             return ctxs
 
-        ctx.thread = thread
-
         if snippet_text is not None:
             # Process snippets
             ctx.command = self._get_snippet_command()
             reply_view = StringView(f"{invoked_prefix}{ctx.command} {snippet_text}")
-            discord.utils.find(reply_view.skip_string, prefixes)
+            reply_view.skip_string(invoked_prefix)
             ctx.invoked_with = reply_view.get_word().lower()
             ctx.view = reply_view
         else:
@@ -1046,6 +1151,16 @@ class ModmailBot(commands.Bot):
 
         return [ctx]
 
+    def _get_step_context(self, ctx, invoked_prefix, text, command=None, *, cls=commands.Context):
+        """Builds the context of an alias step from the context of the message that invoked the alias."""
+        view = StringView(invoked_prefix + text)
+        view.skip_string(invoked_prefix)
+        step_ctx = cls(prefix=ctx.prefix, view=view, bot=self, message=ctx.message)
+        step_ctx.thread = ctx.thread
+        step_ctx.invoked_with = view.get_word().lower()
+        step_ctx.command = command or self.all_commands.get(step_ctx.invoked_with)
+        return step_ctx
+
     async def trigger_auto_triggers(self, message, channel, *, cls=commands.Context):
         message.author = self.modmail_guild.me
         message.channel = channel
@@ -1056,16 +1171,11 @@ class ModmailBot(commands.Bot):
         thread = await self.threads.find(channel=ctx.channel)
 
         invoked_prefix = self.prefix
-        invoker = None
 
-        if self.config.get("use_regex_autotrigger"):
-            trigger = next(filter(lambda x: re.search(x, message.content), self.auto_triggers.keys()))
-            if trigger:
-                invoker = re.search(trigger, message.content).group(0)
-        else:
-            trigger = next(filter(lambda x: x.lower() in message.content.lower(), self.auto_triggers.keys()))
-            if trigger:
-                invoker = trigger.lower()
+        match = self.auto_trigger_matcher.match(message.content)
+        if match is None:
+            return
+        trigger, invoker = match
 
         alias = self.auto_triggers[trigger]
 
@@ -1149,19 +1259,37 @@ class ModmailBot(commands.Bot):
             self.config["level_permissions"] = permissions
         else:
             self.config["command_permissions"] = permissions
+        self.invalidate_permissions()
         logger.info("Updating permissions for %s, %s (add=%s).", name, value, add)
         await self.config.update()
 
+    def _mentions_bot(self, message: discord.Message) -> bool:
+        return f"<@{self.user.id}" in message.content or f"<@!{self.user.id}" in message.content
+
+    def is_relevant_message(self, message: discord.Message) -> bool:
+        """
+        Cheap filter for the messages Modmail may act upon, so that the messages of busy
+        servers are dropped before looking up threads or building command contexts.
+        """
+        if message.author.bot:
+            return False
+        if isinstance(message.channel, discord.DMChannel):
+            return True
+        if message.content.startswith(tuple(self.prefixes)):
+            return True
+        if self.config["alert_on_mention"] and self._mentions_bot(message):
+            return True
+        return self.threads.may_be_thread_channel(message.channel)
+
     async def on_message(self, message):
         await self.wait_for_connected()
         if message.type == discord.MessageType.pins_add and message.author == self.user:
             await message.delete()
 
-        if (
-            (f"<@{self.user.id}" in message.content or f"<@!{self.user.id}" in message.content)
-            and self.config["alert_on_mention"]
-            and not message.author.bot
-        ):
+        if not self.is_relevant_message(message):
+            return
+
+        if self._mentions_bot(message) and self.config["alert_on_mention"]:
             em = discord.Embed(
                 title="Bot mention",
                 description=f"[Jump URL]({message.jump_url})\n{truncate(message.content, 50)}",
@@ -1198,7 +1326,7 @@ class ModmailBot(commands.Bot):
                 await self.invoke(ctx)
                 continue
 
-            thread = await self.threads.find(channel=ctx.channel)
+            thread = ctx.thread
             if thread is not None:
                 anonymous = False
                 plain = False
@@ -1380,6 +1508,17 @@ class ModmailBot(commands.Bot):
         if self.config["transfer_reactions"]:
             await self.handle_reaction_events(payload)
 
+    async def on_guild_channel_create(self, channel):
+        if channel.guild != self.modmail_guild or not isinstance(channel, discord.TextChannel):
+            return
+        self.threads.index_channel(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        if after.guild != self.modmail_guild or not isinstance(after, discord.TextChannel):
+            return
+        if before.topic != after.topic:
+            self.threads.reindex_channel(before, after)
+
     async def on_guild_channel_delete(self, channel):
         if channel.guild != self.modmail_guild:
             return
@@ -1394,6 +1533,8 @@ class ModmailBot(commands.Bot):
         if not isinstance(channel, discord.TextChannel):
             return
 
+        self.threads.unindex_channel(channel)
+
         if self.log_channel is None or self.log_channel == channel:
             logger.info("Log channel deleted.")
             self.config.remove("log_channel_id")
@@ -1421,6 +1562,8 @@ class ModmailBot(commands.Bot):
             await thread.close(closer=mod, silent=True, delete_channel=False)
 
     async def on_member_remove(self, member):
+        # a member that rejoins has none of the roles it had
+        self.forget_permission_decisions(member.id)
         thread = await self.threads.find(recipient=member)
         if thread:
             if member.guild == self.guild and self.config["close_on_leave"]:
@@ -1450,7 +1593,20 @@ class ModmailBot(commands.Bot):
                 embed = discord.Embed(description=leave_message, color=self.error_color)
                 await thread.channel.send(embed=embed)
 
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            self.forget_permission_decisions(after.id)
+
+    async def on_guild_role_update(self, before, after):
+        if before.permissions != after.permissions:
+            self.forget_permission_decisions()
+
+    async def on_guild_role_delete(self, role):
+        self.forget_permission_decisions()
+
     async def on_member_join(self, member):
+        # a member that rejoins has none of the roles it had
+        self.forget_permission_decisions(member.id)
         thread = await self.threads.find(recipient=member)
         if thread:
             if len(self.guilds) > 1:
@@ -1556,7 +1712,7 @@ class ModmailBot(commands.Bot):
             await context.send(embed=discord.Embed(color=self.error_color, description=str(exception)))
         elif isinstance(exception, commands.CommandNotFound):
             logger.warning("CommandNotFound: %s", exception)
-        elif isinstance(exception, commands.MissingRequiredArgument):
+        elif isinstance(exception, (commands.MissingRequiredArgument, commands.TooManyArguments)):
             await context.send_help(context.command)
         elif isinstance(exception, commands.CommandOnCooldown):
             await context.send(
@@ -1567,20 +1723,25 @@ class ModmailBot(commands.Bot):
                 )
             )
         elif isinstance(exception, commands.CheckFailure):
-            for check in context.command.checks:
-                if not await check(context):
-                    if hasattr(check, "fail_msg"):
-                        await context.send(
-                            embed=discord.Embed(color=self.error_color, description=check.fail_msg)
-                        )
-                    if hasattr(check, "permission_level"):
-                        corrected_permission_level = self.command_perm(context.command.qualified_name)
-                        logger.warning(
-                            "User %s does not have permission to use this command: `%s` (%s).",
-                            context.author.name,
-                            context.command.qualified_name,
-                            corrected_permission_level.name,
-                        )
+            failed_check = getattr(context, "failed_check", None)
+            if failed_check is not None:
+                failed_checks = [failed_check]
+            else:
+                # checks that don't record their failure, such as those of plugins
+                failed_checks = [check for check in context.command.checks if not await check(context)]
+            for check in failed_checks:
+                if hasattr(check, "fail_msg"):
+                    await context.send(
+                        embed=discord.Embed(color=self.error_color, description=check.fail_msg)
+                    )
+                if hasattr(check, "permission_level"):
+                    corrected_permission_level = self.command_perm(context.command.qualified_name)
+                    logger.warning(
+                        "User %s does not have permission to use this command: `%s` (%s).",
+                        context.author.name,
+                        context.command.qualified_name,
+                        corrected_permission_level.name,
+                    )
             logger.warning("CheckFailure: %s", exception)
         elif isinstance(exception, commands.DisabledCommand):
             logger.info("DisabledCommand: %s is trying to run eval but it's disabled", context.author.name)
@@ -1723,6 +1884,56 @@ class ModmailBot(commands.Bot):
 
         logger.info(f"Deleted {expired_logs.deleted_count} expired logs.")
 
+    @tasks.loop(minutes=5)
+    async def save_thread_snapshot(self):
+        self.threads.save_snapshot()
+
+    @tasks.loop(minutes=1)
+    async def schedule_closures(self):
+        """Starts the timers of the closures that are due before the next run."""
+        due_before = discord.utils.utcnow() + timedelta(minutes=2)
+        for closure in await self.api.get_closures(due_before=due_before):
+            try:
+                await self.restore_closure(closure)
+            except Exception:
+                logger.error("Failed to schedule closure for %s.", closure["recipient_id"], exc_info=True)
+
+    async def restore_closure(self, closure: dict) -> None:
+        """Starts the timer of a stored closure, unless it's already running."""
+        recipient_id = int(closure["recipient_id"])
+        closes_at = closure["time"]
+        if closes_at.tzinfo is None:
+            closes_at = closes_at.replace(tzinfo=timezone.utc)
+
+        after = (closes_at - discord.utils.utcnow()).total_seconds()
+        if after <= 0:
+            logger.debug("Closing thread for recipient %s.", recipient_id)
+            after = 0
+        else:
+            logger.debug("Thread for recipient %s will be closed after %s seconds.", recipient_id, after)
+
+        thread = await self.threads.find(recipient_id=recipient_id)
+
+        if not thread:
+            # If the channel is deleted
+            logger.debug("Failed to close thread for recipient %s.", recipient_id)
+            await self.api.delete_closure(recipient_id)
+            return
+
+        closer = await self.get_or_fetch_user(closure["closer_id"])
+        auto_close = closure.get("auto_close", False)
+        if (thread.auto_close_task if auto_close else thread.close_task) is not None:
+            return
+
+        await thread.close(
+            closer=closer,
+            after=after,
+            silent=closure["silent"],
+            delete_channel=closure["delete_channel"],
+            message=closure["message"],
+            auto_close=auto_close,
+        )
+
     def format_channel_name(self, author, exclude_channel=None, force_null=False):
         """Sanitises a username for use with text channel names
 
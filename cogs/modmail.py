@@ -1,6 +1,6 @@
 import asyncio
 import re
-from datetime import timezone
+from datetime import timedelta, timezone
 from typing import List, Literal, Optional, Tuple, Union
 
 import discord
@@ -12,7 +12,7 @@ from discord.ext.commands.view import StringView
 from core import blocklist, checks
 from core.blocklist import BlockType
 from core.models import DMDisabled, PermissionLevel, SimilarCategoryConverter, getLogger
-from core.paginator import EmbedPaginatorSession
+from core.paginator import EmbedPaginatorSession, LazyEmbedPaginatorSession
 from core.thread import Thread
 from core.time import ShortTime, human_timedelta
 from core.utils import *
@@ -143,7 +143,7 @@ class Modmail(commands.Cog):
             snippet_name = self.bot._resolve_snippet(name)
 
             if snippet_name is None:
-                embed = create_not_found_embed(name, self.bot.snippets.keys(), "Snippet")
+                embed = create_not_found_embed(name, self.bot.suggestion_index("snippets"), "Snippet")
             else:
                 val = self.bot.snippets[snippet_name]
                 embed = discord.Embed(
@@ -183,7 +183,7 @@ class Modmail(commands.Cog):
         """
         snippet_name = self.bot._resolve_snippet(name)
         if snippet_name is None:
-            embed = create_not_found_embed(name, self.bot.snippets.keys(), "Snippet")
+            embed = create_not_found_embed(name, self.bot.suggestion_index("snippets"), "Snippet")
         else:
             val = truncate(escape_code_block(self.bot.snippets[snippet_name]), 2048 - 7)
             embed = discord.Embed(
@@ -351,7 +351,7 @@ class Modmail(commands.Cog):
             self.bot.snippets.pop(name)
             await self.bot.config.update()
         else:
-            embed = create_not_found_embed(name, self.bot.snippets.keys(), "Snippet")
+            embed = create_not_found_embed(name, self.bot.suggestion_index("snippets"), "Snippet")
         await ctx.send(embed=embed)
 
     @snippet.command(name="edit")
@@ -374,7 +374,7 @@ class Modmail(commands.Cog):
                 description=f'`{name}` will now send "{value}".',
             )
         else:
-            embed = create_not_found_embed(name, self.bot.snippets.keys(), "Snippet")
+            embed = create_not_found_embed(name, self.bot.suggestion_index("snippets"), "Snippet")
         await ctx.send(embed=embed)
 
     @commands.command(usage="<category> [options]")
@@ -547,21 +547,12 @@ class Modmail(commands.Cog):
         if mention is None:
             raise commands.BadArgument(f"{user_or_role} is not a valid user or role.")
 
-        thread = ctx.thread
-
-        if str(thread.id) not in self.bot.config["notification_squad"]:
-            self.bot.config["notification_squad"][str(thread.id)] = []
-
-        mentions = self.bot.config["notification_squad"][str(thread.id)]
-
-        if mention in mentions:
+        if not await self.bot.notifications.add_notification(ctx.thread.id, mention):
             embed = discord.Embed(
                 color=self.bot.error_color,
                 description=f"{mention} is already going to be mentioned.",
             )
         else:
-            mentions.append(mention)
-            await self.bot.config.update()
             embed = discord.Embed(
                 color=self.bot.main_color,
                 description=f"{mention} will be mentioned on the next message received.",
@@ -583,21 +574,12 @@ class Modmail(commands.Cog):
         if mention is None:
             mention = f"`{user_or_role}`"
 
-        thread = ctx.thread
-
-        if str(thread.id) not in self.bot.config["notification_squad"]:
-            self.bot.config["notification_squad"][str(thread.id)] = []
-
-        mentions = self.bot.config["notification_squad"][str(thread.id)]
-
-        if mention not in mentions:
+        if not await self.bot.notifications.remove_notification(ctx.thread.id, mention):
             embed = discord.Embed(
                 color=self.bot.error_color,
                 description=f"{mention} does not have a pending notification.",
             )
         else:
-            mentions.remove(mention)
-            await self.bot.config.update()
             embed = discord.Embed(
                 color=self.bot.main_color, description=f"{mention} will no longer be notified."
             )
@@ -620,21 +602,12 @@ class Modmail(commands.Cog):
         if mention is None:
             raise commands.BadArgument(f"{user_or_role} is not a valid user or role.")
 
-        thread = ctx.thread
-
-        if str(thread.id) not in self.bot.config["subscriptions"]:
-            self.bot.config["subscriptions"][str(thread.id)] = []
-
-        mentions = self.bot.config["subscriptions"][str(thread.id)]
-
-        if mention in mentions:
+        if not await self.bot.notifications.add_subscription(ctx.thread.id, mention):
             embed = discord.Embed(
                 color=self.bot.error_color,
                 description=f"{mention} is already subscribed to this thread.",
             )
         else:
-            mentions.append(mention)
-            await self.bot.config.update()
             embed = discord.Embed(
                 color=self.bot.main_color,
                 description=f"{mention} will now be notified of all messages received.",
@@ -656,21 +629,12 @@ class Modmail(commands.Cog):
         if mention is None:
             mention = f"`{user_or_role}`"
 
-        thread = ctx.thread
-
-        if str(thread.id) not in self.bot.config["subscriptions"]:
-            self.bot.config["subscriptions"][str(thread.id)] = []
-
-        mentions = self.bot.config["subscriptions"][str(thread.id)]
-
-        if mention not in mentions:
+        if not await self.bot.notifications.remove_subscription(ctx.thread.id, mention):
             embed = discord.Embed(
                 color=self.bot.error_color,
                 description=f"{mention} is not subscribed to this thread.",
             )
         else:
-            mentions.remove(mention)
-            await self.bot.config.update()
             embed = discord.Embed(
                 color=self.bot.main_color,
                 description=f"{mention} is now unsubscribed from this thread.",
@@ -1653,87 +1617,83 @@ class Modmail(commands.Cog):
             await asyncio.sleep(5)
             await ctx.message.delete()
 
-    @commands.group(invoke_without_command=True)
+    @commands.group(invoke_without_command=True, usage="[users|roles] [issuer] [expiring]")
     @checks.has_permissions(PermissionLevel.MODERATOR)
     @trigger_typing
-    async def blocked(self, ctx):
-        """Retrieve a list of blocked users."""
+    async def blocked(
+        self,
+        ctx,
+        block_type: Optional[Literal["users", "roles"]] = None,
+        issuer: Optional[User] = None,
+        expiring: Optional[Literal["expiring"]] = None,
+    ):
+        """
+        Retrieve a list of blocked users and roles.
 
-        roles, users = [], []
+        The list can be narrowed down with, in this order:
+        - `users` or `roles` to only list blocked users or roles.
+        - `issuer`, to only list blocks issued by that moderator.
+        - `expiring`, to only list blocks that expire within a day.
+        """
+        if block_type == "users":
+            title = "Blocked Users"
+        elif block_type == "roles":
+            title = "Blocked Roles"
+        else:
+            title = "Blocked Users and Roles"
 
-        blocked: list[blocklist.BlocklistEntry] = await self.bot.blocklist.get_all_blocks()
+        filters = {
+            "block_type": {"users": BlockType.USER, "roles": BlockType.ROLE}.get(block_type),
+            "blocked_by": issuer.id if issuer is not None else None,
+            "expires_before": discord.utils.utcnow() + timedelta(days=1) if expiring else None,
+        }
+        per_page = 10
 
-        for item in blocked:
-            human_blocked_at = discord.utils.format_dt(item.timestamp, style="R")
-            if item.expires_at is not None:
-                human_blocked_until = discord.utils.format_dt(item.expires_at, style="R")
-            else:
-                human_blocked_until = "Permanent"
+        count = await self.bot.blocklist.count_blocks(**filters)
+        # page index -> _id of the last block before it, for the pages reached so far
+        page_cursors = {0: None}
 
-            if item.type == blocklist.BlockType.USER:
-                string = f"<@{item.id}>"
+        async def get_page(index: int) -> discord.Embed:
+            if index in page_cursors:
+                blocks = await self.bot.blocklist.get_blocks(
+                    after=page_cursors[index], limit=per_page, **filters
+                )
             else:
-                string = f"<@&{item.id}>"
-
-            string += f" ({human_blocked_until})"
-
-            string += f"\n- Issued {human_blocked_at} by <@{item.blocking_user_id}>"
-
-            if item.reason is not None:
-                string += f"\n- Blocked for {item.reason}"
-            string += "\n"
-
-            if item.type == blocklist.BlockType.USER:
-                users.append(string)
-            elif item.type == blocklist.BlockType.ROLE:
-                roles.append(string)
-
-        user_embeds = [discord.Embed(title="Blocked Users", color=self.bot.main_color, description="")]
-
-        if users:
-            embed = user_embeds[0]
-
-            for line in users:
-                if len(embed.description) + len(users) > 2048:
-                    embed = discord.Embed(
-                        title="Blocked Users",
-                        color=self.bot.main_color,
-                        description=users,
-                    )
-                    user_embeds.append(embed)
+                # jumping past the pages reached so far
+                blocks = await self.bot.blocklist.get_blocks(skip=index * per_page, limit=per_page, **filters)
+            if blocks:
+                page_cursors[index + 1] = blocks[-1][0]
+
+            lines = []
+            for _, item in blocks:
+                human_blocked_at = discord.utils.format_dt(item.timestamp, style="R")
+                if item.expires_at is not None:
+                    human_blocked_until = discord.utils.format_dt(item.expires_at, style="R")
                 else:
-                    embed.description += line
-        else:
-            user_embeds[0].description = "No users are currently blocked."
+                    human_blocked_until = "Permanent"
 
-        if len(user_embeds) > 1:
-            for n, em in enumerate(user_embeds):
-                em.title = f"{em.title} [{n + 1}]"
+                if item.type == blocklist.BlockType.USER:
+                    string = f"<@{item.id}>"
+                else:
+                    string = f"<@&{item.id}>"
 
-        role_embeds = [discord.Embed(title="Blocked Roles", color=self.bot.main_color, description="")]
+                string += f" ({human_blocked_until})"
 
-        if roles:
-            embed = role_embeds[-1]
+                string += f"\n- Issued {human_blocked_at} by <@{item.blocking_user_id}>"
 
-            for line in roles:
-                if len(embed.description) + len(line) > 2048:
-                    role_embeds[-1].set_author()
-                    embed = discord.Embed(
-                        title="Blocked Roles",
-                        color=self.bot.main_color,
-                        description=line,
-                    )
-                    role_embeds.append(embed)
-                else:
-                    embed.description += line
-        else:
-            role_embeds[-1].description = "No roles are currently blocked."
+                if item.reason is not None:
+                    string += f"\n- Blocked for {truncate(item.reason, 200)}"
+                lines.append(string)
 
-        if len(role_embeds) > 1:
-            for n, em in enumerate(role_embeds):
-                em.title = f"{em.title} [{n + 1}]"
+            embed = discord.Embed(title=title, color=self.bot.main_color)
+            if lines:
+                embed.description = "\n".join(lines)
+            else:
+                embed.description = "No blocks found."
+            embed.set_footer(text=f"{count} block{'s' if count != 1 else ''}")
+            return embed
 
-        session = EmbedPaginatorSession(ctx, *user_embeds, *role_embeds)
+        session = LazyEmbedPaginatorSession(ctx, max(1, -(-count // per_page)), get_page)
 
         await session.run()
 
@@ -1790,113 +1750,109 @@ class Modmail(commands.Cog):
 
         return await ctx.send(embed=embed)
 
-    @commands.command(usage="[user_or_role] [duration] [reason]")
+    @commands.command(usage="[users_and_roles...] [duration] [reason]")
     @checks.has_permissions(PermissionLevel.MODERATOR)
     @trigger_typing
     async def block(
         self,
         ctx,
-        user_or_role: Union[discord.User, discord.Role, None],
+        users_and_roles: commands.Greedy[UserOrRoleID],
         duration: Optional[ShortTime],
         *,
         reason: Optional[str],
     ):
         """
-        Block a user or role from using Modmail.
+        Block users or roles from using Modmail.
 
-        You may choose to set a time as to when the user will automatically be unblocked.
+        You may choose to set a time as to when they will automatically be unblocked.
 
-        Leave `user_or_role` blank when this command is used within a
+        Leave `users_and_roles` blank when this command is used within a
         thread channel to block the current recipient.
-        `user_or_role` may be an ID, mention, or name.
+        `users_and_roles` may be IDs or mentions, separated by spaces.
         `duration` may be a simple "human-readable" time text. Example: `1d`, `30m`, `5h`.
         """
-        user_or_role = ctx.thread.recipient if (ctx.thread and not user_or_role) else user_or_role
-
-        if not user_or_role:
-            raise commands.MissingRequiredArgument(DummyParam("user or role"))
+        if not users_and_roles and ctx.thread:
+            users_and_roles = [ctx.thread.recipient]
 
-        mention = getattr(user_or_role, "mention", f"`{user_or_role.id}`")
+        if not users_and_roles:
+            raise commands.MissingRequiredArgument(DummyParam("users or roles"))
 
-        async def send_embed(title: str, message: str):
-            embed = discord.Embed(
-                title=title,
-                description=message,
-                color=self.bot.error_color if "error" in title.lower() else self.bot.main_color,
+        targets = {}
+        errors = []
+        for user_or_role in users_and_roles:
+            mention = getattr(user_or_role, "mention", f"`{user_or_role.id}`")
+            if isinstance(user_or_role, discord.Role):
+                targets[user_or_role.id] = (mention, BlockType.ROLE)
+            elif str(user_or_role.id) in self.bot.blocked_whitelisted_users:
+                errors.append(f"Cannot block {mention}, user is whitelisted.")
+            else:
+                targets[user_or_role.id] = (mention, BlockType.USER)
+
+        if targets:
+            await self.bot.blocklist.block_many(
+                targets=[(target_id, block_type) for target_id, (_, block_type) in targets.items()],
+                reason=reason,
+                expires_at=duration.dt if duration is not None else None,
+                blocked_by=ctx.author.id,
             )
-            return await ctx.send(embed=embed)
 
-        if (
-            not isinstance(user_or_role, discord.Role)
-            and str(user_or_role.id) in self.bot.blocked_whitelisted_users
-        ):
-            return await send_embed("Error", f"Cannot block {mention}, user is whitelisted.")
-
-        desc = f"{mention} is now blocked."
-        if duration:
-            desc += f"\n- Expires: {discord.utils.format_dt(duration.dt, style='R')}"
-        desc += f"\n- By: {ctx.author.mention}"
-        if reason:
-            desc += f"\n- Reason: {reason}"
-
-        blocktype: BlockType
-
-        if isinstance(user_or_role, discord.Role):
-            blocktype = BlockType.ROLE
-        elif isinstance(user_or_role, discord.User):
-            blocktype = BlockType.USER
+            mentions = [mention for mention, _ in targets.values()]
+            title = "Success"
+            desc = f"{', '.join(mentions)} {'is' if len(mentions) == 1 else 'are'} now blocked."
+            if duration:
+                desc += f"\n- Expires: {discord.utils.format_dt(duration.dt, style='R')}"
+            desc += f"\n- By: {ctx.author.mention}"
+            if reason:
+                desc += f"\n- Reason: {reason}"
+            if errors:
+                desc += "\n\n" + "\n".join(errors)
         else:
-            return logger.warning(
-                f"{__name__}: cannot block user, user is neither an instance of Discord Role or User"
-            )
+            title = "Error"
+            desc = "\n".join(errors)
 
-        await self.bot.blocklist.block_id(
-            user_id=user_or_role.id,
-            reason=reason,
-            expires_at=duration.dt if duration is not None else None,
-            blocked_by=ctx.author.id,
-            block_type=blocktype,
+        embed = discord.Embed(
+            title=title,
+            description=desc,
+            color=self.bot.error_color if title == "Error" else self.bot.main_color,
         )
+        return await ctx.send(embed=embed)
 
-        return await send_embed("Success", desc)
-
-    @commands.command()
+    @commands.command(usage="[users_and_roles...]", ignore_extra=False)
     @checks.has_permissions(PermissionLevel.MODERATOR)
     @trigger_typing
-    async def unblock(self, ctx, *, user_or_role: Union[discord.User, discord.Role, None]):
+    async def unblock(self, ctx, users_and_roles: commands.Greedy[UserOrRoleID]):
         """
-        Unblock a user or role from using Modmail.
+        Unblock users or roles from using Modmail.
 
-        Leave `user_or_role` blank when this command is used within a
+        Leave `users_and_roles` blank when this command is used within a
         thread channel to unblock the current recipient.
-        `user_or_role` may be an ID, mention, or name.
+        `users_and_roles` may be IDs or mentions, separated by spaces.
         """
-        user_or_role = ctx.thread.recipient if (ctx.thread and not user_or_role) else user_or_role
-
-        if not user_or_role:
-            raise commands.MissingRequiredArgument(DummyParam("user or role"))
+        if not users_and_roles and ctx.thread:
+            users_and_roles = [ctx.thread.recipient]
 
-        mention = getattr(user_or_role, "mention", f"`{user_or_role.id}`")
-
-        async def send_embed(title: str, message: str):
-            embed = discord.Embed(
-                title=title,
-                description=message,
-                color=self.bot.error_color if "error" in title.lower() else self.bot.main_color,
-            )
-            return await ctx.send(embed=embed)
+        if not users_and_roles:
+            raise commands.MissingRequiredArgument(DummyParam("users or roles"))
 
-        title, desc = "Error", f"{mention} is not blocked."
+        mentions = {u.id: getattr(u, "mention", f"`{u.id}`") for u in users_and_roles}
+        unblocked = await self.bot.blocklist.unblock_many(list(mentions))
+        not_blocked = [mention for id_, mention in mentions.items() if id_ not in unblocked]
 
-        if not isinstance(user_or_role, (discord.Role, discord.User)):
-            return logger.warning(
-                f"{__name__}: cannot unblock, user is neither an instance of Discord Role or User"
+        lines = []
+        if unblocked:
+            lines.append(
+                f"{', '.join(mentions[id_] for id_ in unblocked)} "
+                f"{'has' if len(unblocked) == 1 else 'have'} been unblocked."
             )
+        if not_blocked:
+            lines.append(f"{', '.join(not_blocked)} {'is' if len(not_blocked) == 1 else 'are'} not blocked.")
 
-        if not await self.bot.blocklist.unblock_id(user_or_role.id):
-            return await send_embed(title, desc)
-
-        return await send_embed("Success", f"{mention} has been unblocked.")
+        embed = discord.Embed(
+            title="Success" if unblocked else "Error",
+            description="\n".join(lines),
+            color=self.bot.main_color if unblocked else self.bot.error_color,
+        )
+        return await ctx.send(embed=embed)
 
     @commands.command()
     @checks.has_permissions(PermissionLevel.SUPPORTER)
@@ -1951,9 +1907,19 @@ class Modmail(commands.Cog):
         )
         if thread is not None:
             logger.debug("Found thread with tempered ID.")
+            self.bot.threads.index_thread(thread)
             await ctx.channel.edit(reason="Fix broken Modmail thread", topic=f"User ID: {user_id}")
             return await self.bot.add_reaction(ctx.message, sent_emoji)
 
+        # the thread entry isn't affected by changes to the channel
+        entry = await self.bot.api.get_thread_entry(ctx.channel.id)
+        if entry is not None:
+            thread = await self.bot.threads.restore_from_entry(ctx.channel, entry)
+            if thread.channel == ctx.channel:
+                logger.info("Restoring current channel's topic and thread from the thread entry.")
+                thread.update_topic()
+                return await self.bot.add_reaction(ctx.message, sent_emoji)
+
         # find genesis message to retrieve User ID
         async for message in ctx.channel.history(limit=10, oldest_first=True):
             if (
@@ -1978,7 +1944,9 @@ class Modmail(commands.Cog):
                         self.bot.threads.cache[user_id] = thread = Thread(
                             self.bot.threads, recipient, ctx.channel, other_recipients
                         )
+                    self.bot.threads.index_thread(thread)
                     thread.ready = True
+                    await thread.save_entry()
                     logger.info("Setting current channel's topic to User ID and created new thread.")
                     await ctx.channel.edit(reason="Fix broken Modmail thread", topic=f"User ID: {user_id}")
                     return await self.bot.add_reaction(ctx.message, sent_emoji)
@@ -2002,6 +1970,7 @@ class Modmail(commands.Cog):
                 recipient = self.bot.get_user(user.id)
                 if user.id in self.bot.threads.cache:
                     thread = self.bot.threads.cache[user.id]
+                    self.bot.threads.unindex_thread(thread)
                     if thread.channel:
                         embed = discord.Embed(
                             title="Delete Channel",
@@ -2016,6 +1985,7 @@ class Modmail(commands.Cog):
                             await thread.channel.send(embed=embed)
                         except discord.HTTPException:
                             pass
+                        await self.bot.api.delete_thread_entry(thread.channel.id)
 
                 other_recipients = match_other_recipients(ctx.channel.topic)
                 for n, uid in enumerate(other_recipients):
@@ -2029,7 +1999,9 @@ class Modmail(commands.Cog):
                     self.bot.threads.cache[user.id] = thread = Thread(
                         self.bot.threads, recipient, ctx.channel, other_recipients
                     )
+                self.bot.threads.index_thread(thread)
                 thread.ready = True
+                await thread.save_entry()
                 logger.info("Setting current channel's topic to User ID and created new thread.")
                 await ctx.channel.edit(
                     reason="Fix broken Modmail thread", name=name, topic=f"User ID: {user.id}"
@@ -6,7 +6,6 @@ import sys
 import traceback
 from contextlib import redirect_stdout
 from copy import copy
-from difflib import get_close_matches
 from io import BytesIO, StringIO
 from itertools import takewhile, zip_longest
 from json import JSONDecodeError
@@ -233,13 +232,7 @@ class ModmailHelpCommand(commands.HelpCommand):
         embed = discord.Embed(color=self.context.bot.error_color)
         embed.set_footer(text=f'Command/Category "{command}" not found.')
 
-        choices = set()
-
-        for cmd in self.context.bot.walk_commands():
-            if not cmd.hidden:
-                choices.add(cmd.qualified_name)
-
-        closest = get_close_matches(command, choices)
+        closest = self.context.bot.suggestion_index("commands").suggest(command, n=3)
         if closest:
             embed.add_field(name="Perhaps you meant:", value="\n".join(f"`{x}`" for x in closest))
         else:
@@ -896,9 +889,7 @@ class Utility(commands.Cog):
         if key is not None and not (
             key in self.bot.config.public_keys or key in self.bot.config.protected_keys
         ):
-            closest = get_close_matches(
-                key, {**self.bot.config.public_keys, **self.bot.config.protected_keys}
-            )
+            closest = self.bot.suggestion_index("config").suggest(key, n=3)
             embed = discord.Embed(
                 title="Error",
                 color=self.bot.error_color,
@@ -977,7 +968,7 @@ class Utility(commands.Cog):
         if name is not None:
             val = self.bot.aliases.get(name)
             if val is None:
-                embed = utils.create_not_found_embed(name, self.bot.aliases.keys(), "Alias")
+                embed = utils.create_not_found_embed(name, self.bot.suggestion_index("aliases"), "Alias")
                 return await ctx.send(embed=embed)
 
             values = utils.parse_alias(val)
@@ -1041,7 +1032,7 @@ class Utility(commands.Cog):
         """
         val = self.bot.aliases.get(name)
         if val is None:
-            embed = utils.create_not_found_embed(name, self.bot.aliases.keys(), "Alias")
+            embed = utils.create_not_found_embed(name, self.bot.suggestion_index("aliases"), "Alias")
             return await ctx.send(embed=embed)
 
         val = utils.truncate(utils.escape_code_block(val), 2048 - 7)
@@ -1111,6 +1102,8 @@ class Utility(commands.Cog):
                 embed.add_field(name=f"Step {i}:", value=utils.truncate(val, 1024))
 
         self.bot.aliases[name] = " && ".join(f'"{a}"' for a in save_aliases)
+        # compile the new steps now rather than on the first invocation
+        utils.compile_alias(self.bot.aliases[name])
         await self.bot.config.update()
         return embed
 
@@ -1178,7 +1171,7 @@ class Utility(commands.Cog):
                 description=f"Successfully deleted `{name}`.",
             )
         else:
-            embed = utils.create_not_found_embed(name, self.bot.aliases.keys(), "Alias")
+            embed = utils.create_not_found_embed(name, self.bot.suggestion_index("aliases"), "Alias")
 
         return await ctx.send(embed=embed)
 
@@ -1189,7 +1182,7 @@ class Utility(commands.Cog):
         Edit an alias.
         """
         if name not in self.bot.aliases:
-            embed = utils.create_not_found_embed(name, self.bot.aliases.keys(), "Alias")
+            embed = utils.create_not_found_embed(name, self.bot.suggestion_index("aliases"), "Alias")
             return await ctx.send(embed=embed)
 
         embed = await self.make_alias(name, value, "Edited")
@@ -1322,6 +1315,7 @@ class Utility(commands.Cog):
                 level.name,
             )
             self.bot.config["override_command_level"][command.qualified_name] = level.name
+            self.bot.invalidate_permissions()
 
             await self.bot.config.update()
             embed = discord.Embed(
@@ -1453,6 +1447,7 @@ class Utility(commands.Cog):
             else:
                 logger.info("Restored command permission level for `%s`.", name)
                 self.bot.config["override_command_level"].pop(name)
+                self.bot.invalidate_permissions()
                 await self.bot.config.update()
                 perm = self.bot.command_perm(name)
                 embed = discord.Embed(
@@ -1574,24 +1569,18 @@ class Utility(commands.Cog):
         """
 
         if name is None and user_or_role not in {"command", "level", "override"}:
-            value = str(self._verify_user_or_role(user_or_role))
+            value = self._verify_user_or_role(user_or_role)
 
             cmds = []
             levels = []
 
-            done = set()
-            command_permissions = self.bot.config["command_permissions"]
-            level_permissions = self.bot.config["level_permissions"]
-            for command in self.bot.walk_commands():
-                if command not in done:
-                    done.add(command)
-                    permissions = command_permissions.get(command.qualified_name, [])
-                    if value in permissions:
-                        cmds.append(command.qualified_name)
-
-            for level in PermissionLevel:
-                permissions = level_permissions.get(level.name, [])
-                if value in permissions:
+            permission_index = self.bot.permission_index
+            for name, ids in permission_index.commands.items():
+                if value in ids and self.bot.get_command(name) is not None:
+                    cmds.append(name)
+
+            for level, ids in permission_index.level_ids.items():
+                if value in ids:
                     levels.append(level.name)
 
             mention = getattr(user_or_role, "name", getattr(user_or_role, "id", user_or_role))
@@ -1809,6 +1798,7 @@ class Utility(commands.Cog):
 
             if valid:
                 self.bot.auto_triggers[keyword] = command
+                self.bot.invalidate_auto_triggers()
                 await self.bot.config.update()
 
                 embed = discord.Embed(
@@ -1830,7 +1820,9 @@ class Utility(commands.Cog):
     async def autotrigger_edit(self, ctx, keyword, *, command):
         """Edits a pre-existing trigger to automatically trigger an alias-like command"""
         if keyword not in self.bot.auto_triggers:
-            embed = utils.create_not_found_embed(keyword, self.bot.auto_triggers.keys(), "Autotrigger")
+            embed = utils.create_not_found_embed(
+                keyword, self.bot.suggestion_index("auto_triggers"), "Autotrigger"
+            )
         else:
             # command validation
             valid = False
@@ -1870,6 +1862,7 @@ class Utility(commands.Cog):
         """Removes a trigger to automatically trigger an alias-like command"""
         try:
             del self.bot.auto_triggers[keyword]
+            self.bot.invalidate_auto_triggers()
         except KeyError:
             embed = discord.Embed(
                 title="Error",
@@ -1891,22 +1884,17 @@ class Utility(commands.Cog):
     @checks.has_permissions(PermissionLevel.OWNER)
     async def autotrigger_test(self, ctx, *, text):
         """Tests a string against the current autotrigger setup"""
-        for keyword in self.bot.auto_triggers:
-            if self.bot.config.get("use_regex_autotrigger"):
-                check = re.search(keyword, text)
-                regex = True
-            else:
-                check = keyword.lower() in text.lower()
-                regex = False
-
-            if check:
-                alias = self.bot.auto_triggers[keyword]
-                embed = discord.Embed(
-                    title=f"{'Regex ' if regex else ''}Keyword Found",
-                    color=self.bot.main_color,
-                    description=f"autotrigger keyword `{keyword}` found. Command executed: `{alias}`",
-                )
-                return await ctx.send(embed=embed)
+        matcher = self.bot.auto_trigger_matcher
+        match = matcher.match(text)
+        if match is not None:
+            keyword, _ = match
+            alias = self.bot.auto_triggers[keyword]
+            embed = discord.Embed(
+                title=f"{'Regex ' if matcher.regex else ''}Keyword Found",
+                color=self.bot.main_color,
+                description=f"autotrigger keyword `{keyword}` found. Command executed: `{alias}`",
+            )
+            return await ctx.send(embed=embed)
 
         embed = discord.Embed(
             title="Keyword Not Found",
@@ -1,14 +1,19 @@
+import asyncio
 import datetime
 import enum
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import discord
 import isodate
-from bson import CodecOptions
+from bson import CodecOptions, ObjectId
 from motor.core import AgnosticCollection
 from strenum import StrEnum
 
+from core.models import getLogger
+
+logger = getLogger(__name__)
+
 
 class BlockType(enum.IntEnum):
     USER = 0
@@ -54,13 +59,53 @@ class Blocklist:
             codec_options=CodecOptions(tz_aware=True, tzinfo=datetime.timezone.utc)
         )
         self.bot = bot
+        # active blocks by user or role id, so checks don't need to query the database
+        self._entries: Dict[int, BlocklistEntry] = {}
+        self._expiry_timers: Dict[int, asyncio.TimerHandle] = {}
 
     async def setup(self):
         await self.blocklist_collection.create_index("id")
         await self.blocklist_collection.create_index("expires_at", expireAfterSeconds=0)
+        # for filtering the blocked listing, which is ordered by _id
+        await self.blocklist_collection.create_index([("type", 1), ("_id", 1)])
+        await self.blocklist_collection.create_index([("blocking_user_id", 1), ("_id", 1)])
+        await self.load()
+
+    async def load(self) -> None:
+        """Loads all active blocks from the database into memory"""
+        for timer in self._expiry_timers.values():
+            timer.cancel()
+        self._entries.clear()
+        self._expiry_timers.clear()
+
+        async for data in self.blocklist_collection.find():
+            self._cache_entry(BlocklistEntry.from_dict(data))
+        logger.debug("Loaded %d active blocks.", len(self._entries))
+
+    def _cache_entry(self, entry: BlocklistEntry) -> None:
+        self._uncache_id(entry.id)
+
+        if entry.expires_at is not None:
+            expires_at = entry.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+            delay = (expires_at - discord.utils.utcnow()).total_seconds()
+            if delay <= 0:
+                return
+            # the database expires the entry on its own, only the cache needs a timer
+            self._expiry_timers[entry.id] = self.bot.loop.call_later(delay, self._uncache_id, entry.id)
+
+        self._entries[entry.id] = entry
+
+    def _uncache_id(self, user_or_role_id: int) -> None:
+        self._entries.pop(user_or_role_id, None)
+        timer = self._expiry_timers.pop(user_or_role_id, None)
+        if timer is not None:
+            timer.cancel()
 
     async def add_block(self, block: BlocklistEntry) -> None:
         await self.blocklist_collection.insert_one(block.__dict__)
+        self._cache_entry(block)
 
     async def block_id(
         self,
@@ -83,8 +128,70 @@ class Blocklist:
             )
         )
 
+    async def block_many(
+        self,
+        targets: List[Tuple[int, BlockType]],
+        expires_at: Optional[datetime.datetime],
+        reason: str,
+        blocked_by: int,
+    ) -> None:
+        """
+        Blocks multiple users or roles with a single database write
+
+        Parameters
+        ----------
+        targets
+            Pairs of the user or role ID to block and its block type.
+        expires_at
+        reason
+        blocked_by
+        """
+        now = datetime.datetime.utcnow()
+
+        blocks = [
+            BlocklistEntry(
+                id=target_id,
+                expires_at=expires_at,
+                reason=reason,
+                timestamp=now,
+                blocking_user_id=blocked_by,
+                type=block_type,
+            )
+            for target_id, block_type in targets
+        ]
+        if not blocks:
+            return
+
+        await self.blocklist_collection.insert_many([block.__dict__ for block in blocks])
+        for block in blocks:
+            self._cache_entry(block)
+
+    async def unblock_many(self, user_or_role_ids: List[int]) -> List[int]:
+        """
+        Unblocks multiple users or roles with a single database write
+
+        Parameters
+        ----------
+        user_or_role_ids
+
+        Returns
+        -------
+
+        The IDs that were blocked, and are now unblocked.
+
+        """
+        unblocked = [i for i in user_or_role_ids if i in self._entries]
+        if not unblocked:
+            return []
+
+        await self.blocklist_collection.delete_many({"id": {"$in": unblocked}})
+        for i in unblocked:
+            self._uncache_id(i)
+        return unblocked
+
     async def unblock_id(self, user_or_role_id: int) -> bool:
         result = await self.blocklist_collection.delete_one({"id": user_or_role_id})
+        self._uncache_id(user_or_role_id)
         if result.deleted_count == 0:
             return False
         return True
@@ -106,10 +213,10 @@ class Blocklist:
         Tuple[bool, Optional[BlocklistEntry]]
 
         """
-        result = await self.blocklist_collection.find_one({"id": user_or_role_id})
-        if result is None:
+        entry = self._entries.get(user_or_role_id)
+        if entry is None:
             return False, None
-        return True, BlocklistEntry.from_dict(result)
+        return True, entry
 
     async def get_all_blocks(self) -> List[BlocklistEntry]:
         """
@@ -129,7 +236,82 @@ class Blocklist:
             dataclass_list.append(BlocklistEntry.from_dict(i))
         return dataclass_list
 
-    # TODO we will probably want to cache these
+    @staticmethod
+    def _blocks_query(
+        block_type: Optional[BlockType],
+        blocked_by: Optional[int],
+        expires_before: Optional[datetime.datetime],
+    ) -> dict:
+        query = {}
+        if block_type is not None:
+            query["type"] = int(block_type)
+        if blocked_by is not None:
+            query["blocking_user_id"] = blocked_by
+        if expires_before is not None:
+            query["expires_at"] = {"$gt": discord.utils.utcnow(), "$lte": expires_before}
+        return query
+
+    async def count_blocks(
+        self,
+        *,
+        block_type: Optional[BlockType] = None,
+        blocked_by: Optional[int] = None,
+        expires_before: Optional[datetime.datetime] = None,
+    ) -> int:
+        """
+        Counts the active blocks matching the filters, see `get_blocks`
+
+        Returns
+        -------
+
+        The number of matching blocks
+
+        """
+        return await self.blocklist_collection.count_documents(
+            self._blocks_query(block_type, blocked_by, expires_before)
+        )
+
+    async def get_blocks(
+        self,
+        *,
+        block_type: Optional[BlockType] = None,
+        blocked_by: Optional[int] = None,
+        expires_before: Optional[datetime.datetime] = None,
+        after: Optional[ObjectId] = None,
+        skip: int = 0,
+        limit: int,
+    ) -> List[Tuple[ObjectId, BlocklistEntry]]:
+        """
+        Returns a page of active blocks, in the order they were issued
+
+        Pages are fetched with a cursor: pass the `_id` of the last block of the
+        previous page as `after`, `skip` is only meant for jumping to unvisited pages.
+
+        Parameters
+        ----------
+        block_type
+            Only return blocks of this type.
+        blocked_by
+            Only return blocks issued by this user ID.
+        expires_before
+            Only return temporary blocks that expire before this time.
+        after
+        skip
+        limit
+
+        Returns
+        -------
+
+        A list of the `_id` and BlocklistEntry of each block
+
+        """
+        query = self._blocks_query(block_type, blocked_by, expires_before)
+        if after is not None:
+            query["_id"] = {"$gt": after}
+
+        cursor = self.blocklist_collection.find(query).sort("_id", 1).skip(skip).limit(limit)
+        return [(data["_id"], BlocklistEntry.from_dict(data)) async for data in cursor]
+
     async def is_user_blocked(self, member: discord.Member) -> Tuple[bool, Optional[BlockReason]]:
         """
         Side effect free version of is_blocked
@@ -147,14 +329,10 @@ class Blocklist:
         if str(member.id) in self.bot.blocked_whitelisted_users:
             return False, None
 
-        blocked = await self.blocklist_collection.find_one({"id": member.id})
-        if blocked is not None:
+        if member.id in self._entries:
             return True, BlockReason.BLOCKED_USER
 
-        roles = member.roles
-
-        blocked = await self.blocklist_collection.find_one(filter={"id": {"$in": [r.id for r in roles]}})
-        if blocked is not None:
+        if not self._entries.keys().isdisjoint(r.id for r in member.roles):
             return True, BlockReason.BLOCKED_ROLE
 
         if not self.is_valid_account_age(member):
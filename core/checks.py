@@ -1,3 +1,7 @@
+import functools
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
 from discord.ext import commands
 
 from core.models import HostingMethod, PermissionLevel, getLogger
@@ -5,9 +9,105 @@ from core.models import HostingMethod, PermissionLevel, getLogger
 logger = getLogger(__name__)
 
 
+class PermissionIndex:
+    """
+    Lookup tables built from the `level_permissions`, `command_permissions`
+    and `override_command_level` configs, so a permission check is only a few
+    set lookups instead of scanning the configs.
+
+    User and role IDs are stored as ints, -1 is for @everyone.
+
+    It also remembers the latest permission decisions by author, guild and
+    command, as the index is dropped whenever the permission configs change.
+    """
+
+    DECISION_CACHE_SIZE = 1000
+
+    def __init__(self, config):
+        # users and roles granted each level
+        self.level_ids: Dict[PermissionLevel, FrozenSet[int]] = {}
+        # highest level granted to each user or role
+        self.levels: Dict[int, PermissionLevel] = {}
+        level_permissions = config["level_permissions"]
+        for level in PermissionLevel:
+            ids = frozenset(map(int, level_permissions.get(level.name, [])))
+            if not ids:
+                continue
+            self.level_ids[level] = ids
+            for id_ in ids:
+                if level > self.levels.get(id_, PermissionLevel.INVALID):
+                    self.levels[id_] = level
+
+        # users and roles explicitly allowed to use each command
+        self.commands: Dict[str, FrozenSet[int]] = {
+            name: frozenset(map(int, ids)) for name, ids in config["command_permissions"].items()
+        }
+
+        self.overrides: Dict[str, PermissionLevel] = {}
+        for name, level in config["override_command_level"].items():
+            try:
+                self.overrides[name] = PermissionLevel[level.upper()]
+            except KeyError:
+                logger.warning("Invalid override_command_level for command %s.", name)
+
+        self._decisions: OrderedDict[Tuple[int, Optional[int], str], bool] = OrderedDict()
+
+    def max_level(self, ids: Iterable[int]) -> PermissionLevel:
+        """The highest level granted to any of the IDs, or to @everyone"""
+        return max(
+            (self.levels[id_] for id_ in (-1, *ids) if id_ in self.levels),
+            default=PermissionLevel.INVALID,
+        )
+
+    def allows_command(self, command_name: str, ids: Iterable[int]) -> bool:
+        """Whether any of the IDs, or @everyone, is allowed to use the command"""
+        allowed = self.commands.get(command_name)
+        if not allowed:
+            return False
+        return -1 in allowed or not allowed.isdisjoint(ids)
+
+    def get_decision(self, key: Tuple[int, Optional[int], str]) -> Optional[bool]:
+        """The cached decision for (author ID, guild ID, command name), or None"""
+        allowed = self._decisions.get(key)
+        if allowed is not None:
+            self._decisions.move_to_end(key)
+        return allowed
+
+    def cache_decision(self, key: Tuple[int, Optional[int], str], allowed: bool) -> None:
+        self._decisions[key] = allowed
+        self._decisions.move_to_end(key)
+        while len(self._decisions) > self.DECISION_CACHE_SIZE:
+            self._decisions.popitem(last=False)
+
+    def forget_decisions(self, user_id: Optional[int] = None) -> None:
+        """Forgets the cached decisions of a user, or all of them if `user_id` is None"""
+        if user_id is None:
+            self._decisions.clear()
+            return
+        for key in [key for key in self._decisions if key[0] == user_id]:
+            del self._decisions[key]
+
+
+def record_failure(predicate):
+    """
+    Makes a check predicate record itself as `ctx.failed_check` when it fails,
+    so `on_command_error` can report it without running the checks again.
+    """
+
+    @functools.wraps(predicate)
+    async def wrapper(ctx):
+        result = await predicate(ctx)
+        if not result:
+            ctx.failed_check = wrapper
+        return result
+
+    return wrapper
+
+
 def has_permissions_predicate(
     permission_level: PermissionLevel = PermissionLevel.REGULAR,
 ):
+    @record_failure
     async def predicate(ctx):
         return await check_permissions(ctx, ctx.command.qualified_name)
 
@@ -38,6 +138,17 @@ def has_permissions(permission_level: PermissionLevel = PermissionLevel.REGULAR)
 
 
 async def check_permissions(ctx, command_name) -> bool:
+    """Checks permissions for a command for a user, reusing the previous decision if any"""
+    permission_index = ctx.bot.permission_index
+    key = (ctx.author.id, getattr(ctx.guild, "id", None), command_name)
+    allowed = permission_index.get_decision(key)
+    if allowed is None:
+        allowed = await _check_permissions(ctx, command_name)
+        permission_index.cache_decision(key, allowed)
+    return allowed
+
+
+async def _check_permissions(ctx, command_name) -> bool:
     """Logic for checking permissions for a command for a user"""
     if await ctx.bot.is_owner(ctx.author) or ctx.author.id == ctx.bot.user.id:
         # Bot owner(s) (and creator) has absolute power over the bot
@@ -58,26 +169,13 @@ async def check_permissions(ctx, command_name) -> bool:
         logger.debug("Allowed due to administrator.")
         return True
 
-    command_permissions = ctx.bot.config["command_permissions"]
-    checkables = {*ctx.author.roles, ctx.author}
-
-    if command_name in command_permissions:
-        # -1 is for @everyone
-        if -1 in command_permissions[command_name] or any(
-            str(check.id) in command_permissions[command_name] for check in checkables
-        ):
-            return True
+    permission_index = ctx.bot.permission_index
+    checkables = {ctx.author.id, *(role.id for role in ctx.author.roles)}
 
-    level_permissions = ctx.bot.config["level_permissions"]
+    if permission_index.allows_command(command_name, checkables):
+        return True
 
-    for level in PermissionLevel:
-        if level >= permission_level and level.name in level_permissions:
-            # -1 is for @everyone
-            if -1 in level_permissions[level.name] or any(
-                str(check.id) in level_permissions[level.name] for check in checkables
-            ):
-                return True
-    return False
+    return permission_index.max_level(checkables) >= permission_level
 
 
 def thread_only():
@@ -86,6 +184,7 @@ def thread_only():
     is being ran within a Modmail thread.
     """
 
+    @record_failure
     async def predicate(ctx):
         """
         Parameters
@@ -111,6 +210,7 @@ def github_token_required(ignore_if_not_heroku=False):
     is set
     """
 
+    @record_failure
     async def predicate(ctx):
         if ignore_if_not_heroku and ctx.bot.hosting_method != HostingMethod.HEROKU:
             return True
@@ -131,6 +231,7 @@ def updates_enabled():
     updates are enabled
     """
 
+    @record_failure
     async def predicate(ctx):
         return not ctx.bot.config["disable_updates"]
 
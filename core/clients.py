@@ -1,7 +1,8 @@
+import datetime
 import secrets
 import sys
 from json import JSONDecodeError
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Union
 
 import discord
 from aiohttp import ClientResponse, ClientResponseError
@@ -380,7 +381,7 @@ class ApiClient:
     async def get_config(self) -> dict:
         return NotImplemented
 
-    async def update_config(self, data: dict):
+    async def update_config(self, data: dict, keys: Optional[Iterable[str]] = None):
         return NotImplemented
 
     async def edit_message(self, message_id: Union[int, str], new_content: str):
@@ -435,6 +436,38 @@ class ApiClient:
     async def update_nsfw(self, nsfw: bool, channel_id: Union[str, int]):
         return NotImplemented
 
+    async def get_thread_entries(self) -> list:
+        return NotImplemented
+
+    async def get_thread_entry(self, channel_id: Union[str, int]) -> Optional[dict]:
+        return NotImplemented
+
+    async def update_thread_entry(self, channel_id: Union[str, int], data: dict) -> None:
+        return NotImplemented
+
+    async def delete_thread_entry(self, channel_id: Union[str, int]) -> None:
+        return NotImplemented
+
+    async def get_message_link(self, message_id: Union[str, int]) -> Optional[dict]:
+        return NotImplemented
+
+    async def get_closures(
+        self, *, due_before: Optional[datetime.datetime] = None, auto_close: Optional[bool] = None
+    ) -> list:
+        return NotImplemented
+
+    async def update_closure(self, recipient_id: Union[str, int], data: dict) -> None:
+        return NotImplemented
+
+    async def delete_closure(self, recipient_id: Union[str, int]) -> None:
+        return NotImplemented
+
+    async def create_message_link(self, channel_id: Union[str, int], data: dict) -> None:
+        return NotImplemented
+
+    async def delete_message_links(self, channel_id: Union[str, int]) -> None:
+        return NotImplemented
+
 
 class MongoDBClient(ApiClient):
     def __init__(self, bot):
@@ -483,6 +516,13 @@ class MongoDBClient(ApiClient):
                 [("messages.content", "text"), ("messages.author.name", "text"), ("key", "text")]
             )
         await coll.create_index("channel_id", unique=True)
+
+        await self.db.threads.create_index("channel_id", unique=True)
+        await self.db.threads.create_index("recipient_ids")
+        await self.db.message_links.create_index("message_ids")
+        await self.db.message_links.create_index("channel_id")
+        await self.db.closures.create_index([("bot_id", 1), ("recipient_id", 1)], unique=True)
+        await self.db.closures.create_index([("bot_id", 1), ("time", 1)])
         logger.debug("Successfully configured and verified database indexes.")
 
     async def validate_database_connection(self, *, ssl_retry=True):
@@ -626,9 +666,14 @@ class MongoDBClient(ApiClient):
             return {"bot_id": self.bot.user.id}
         return conf
 
-    async def update_config(self, data: dict):
-        toset = self.bot.config.filter_valid(data)
-        unset = self.bot.config.filter_valid({k: 1 for k in self.bot.config.all_keys if k not in data})
+    async def update_config(self, data: dict, keys: Optional[Iterable[str]] = None):
+        """
+        Sets the keys in `data` and unsets the other keys, limited to `keys` if given
+        so that only the keys that changed are written.
+        """
+        keys = self.bot.config.all_keys if keys is None else set(keys)
+        toset = self.bot.config.filter_valid({k: v for k, v in data.items() if k in keys})
+        unset = self.bot.config.filter_valid({k: 1 for k in keys if k not in data})
 
         if toset and unset:
             return await self.db.config.update_one(
@@ -782,6 +827,53 @@ class MongoDBClient(ApiClient):
     async def update_nsfw(self, nsfw: bool, channel_id: Union[str, int]):
         await self.bot.db.logs.find_one_and_update({"channel_id": str(channel_id)}, {"$set": {"nsfw": nsfw}})
 
+    async def get_thread_entries(self) -> list:
+        return await self.db.threads.find({"bot_id": str(self.bot.user.id)}).to_list(None)
+
+    async def get_thread_entry(self, channel_id: Union[str, int]) -> Optional[dict]:
+        return await self.db.threads.find_one({"channel_id": str(channel_id)})
+
+    async def update_thread_entry(self, channel_id: Union[str, int], data: dict) -> None:
+        await self.db.threads.update_one(
+            {"channel_id": str(channel_id)},
+            {"$set": {**data, "bot_id": str(self.bot.user.id)}},
+            upsert=True,
+        )
+
+    async def delete_thread_entry(self, channel_id: Union[str, int]) -> None:
+        await self.db.threads.delete_one({"channel_id": str(channel_id)})
+
+    async def get_message_link(self, message_id: Union[str, int]) -> Optional[dict]:
+        return await self.db.message_links.find_one({"message_ids": str(message_id)})
+
+    async def create_message_link(self, channel_id: Union[str, int], data: dict) -> None:
+        await self.db.message_links.insert_one({**data, "channel_id": str(channel_id)})
+
+    async def delete_message_links(self, channel_id: Union[str, int]) -> None:
+        await self.db.message_links.delete_many({"channel_id": str(channel_id)})
+
+    async def get_closures(
+        self, *, due_before: Optional[datetime.datetime] = None, auto_close: Optional[bool] = None
+    ) -> list:
+        query = {"bot_id": str(self.bot.user.id)}
+        if due_before is not None:
+            query["time"] = {"$lte": due_before}
+        if auto_close is not None:
+            query["auto_close"] = auto_close
+        return await self.db.closures.find(query).to_list(None)
+
+    async def update_closure(self, recipient_id: Union[str, int], data: dict) -> None:
+        await self.db.closures.update_one(
+            {"bot_id": str(self.bot.user.id), "recipient_id": str(recipient_id)},
+            {"$set": data},
+            upsert=True,
+        )
+
+    async def delete_closure(self, recipient_id: Union[str, int]) -> None:
+        await self.db.closures.delete_one(
+            {"bot_id": str(self.bot.user.id), "recipient_id": str(recipient_id)}
+        )
+
 
 class PluginDatabaseClient:
     def __init__(self, bot):
@@ -168,6 +168,7 @@ class ConfigManager:
         "connection_uri": None,  # replace mongo uri in the future
         "owners": None,
         "enable_presence_intent": False,
+        "thread_cache_concurrency": 10,
         # bot
         "token": None,
         "enable_plugins": True,
@@ -237,10 +238,26 @@ class ConfigManager:
 
     defaults = {**public_keys, **private_keys, **protected_keys}
     all_keys = set(defaults.keys())
+    converted_keys = colors | time_deltas | booleans | set(enums) | force_str
+
+    # seconds to wait for more changes before writing the config
+    UPDATE_DELAY = 1
 
     def __init__(self, bot):
         self.bot = bot
         self._cache = {}
+        # converted values of `converted_keys`, so `get` doesn't convert them on every call
+        self._converted = {}
+        # keys set or removed since the last update
+        self._dirty = set()
+        # copies of the last written dict and list values, as those are often modified in place
+        self._persisted = {}
+        self._update_task = None
+        self._update_requests = 0
+        self._flush_lock = asyncio.Lock()
+        # number of config writes, and of update requests that were coalesced into them
+        self.writes = 0
+        self.coalesced_updates = 0
         self.ready_event = asyncio.Event()
         self.config_help = {}
 
@@ -262,6 +279,7 @@ class ConfigManager:
                 except json.JSONDecodeError:
                     logger.critical("Failed to load config.json env values.", exc_info=True)
         self._cache = data
+        self._converted.clear()
 
         config_help_json = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_help.json")
         with open(config_help_json, "r", encoding="utf-8") as f:
@@ -270,15 +288,72 @@ class ConfigManager:
         return self._cache
 
     async def update(self):
-        """Updates the config with data from the cache"""
-        await self.bot.api.update_config(self.filter_default(self._cache))
+        """
+        Schedules the data that changed in the cache to be written to the database.
+
+        Updates requested within `UPDATE_DELAY` seconds of each other are written at once,
+        use `flush` when the data has to be written right away.
+        """
+        self._update_requests += 1
+        if self._update_task is None:
+            self._update_task = self.bot.loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.UPDATE_DELAY)
+        self._update_task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error("Failed to update the config.", exc_info=True)
+
+    async def flush(self) -> None:
+        """Writes the data that changed in the cache to the database"""
+        async with self._flush_lock:
+            keys = self._dirty | {k for k, v in self._persisted.items() if self._cache.get(k) != v}
+            if not keys:
+                return
+            self._dirty = set()
+            self._snapshot(keys)
+
+            try:
+                await self.bot.api.update_config(self.filter_default({k: self._cache[k] for k in keys}), keys)
+            except Exception:
+                # try again with the next update
+                self._dirty |= keys
+                raise
+
+            self.writes += 1
+            self.coalesced_updates += max(self._update_requests - 1, 0)
+            logger.debug(
+                "Wrote %d config key(s) for %d update request(s), %d coalesced in total over %d write(s).",
+                len(keys),
+                self._update_requests,
+                self.coalesced_updates,
+                self.writes,
+            )
+            self._update_requests = 0
+
+    def _snapshot(self, keys: typing.Iterable[str]) -> None:
+        for k in keys:
+            value = self._cache.get(k)
+            if isinstance(value, (dict, list)):
+                self._persisted[k] = deepcopy(value)
+            else:
+                self._persisted.pop(k, None)
 
     async def refresh(self) -> dict:
         """Refreshes internal cache with data from database"""
+        if self.ready_event.is_set():
+            # don't lose changes that are waiting to be written
+            await self.flush()
         for k, v in (await self.bot.api.get_config()).items():
             k = k.lower()
             if k in self.all_keys:
                 self._cache[k] = v
+        self._converted.clear()
+        self._dirty.clear()
+        self._persisted.clear()
+        self._snapshot(self._cache)
         if not self.ready_event.is_set():
             self.ready_event.set()
             logger.debug("Successfully fetched configurations from database.")
@@ -293,6 +368,8 @@ class ConfigManager:
         if key not in self.all_keys:
             raise InvalidConfigError(f'Configuration "{key}" is invalid.')
         self._cache[key] = item
+        self._converted.pop(key, None)
+        self._dirty.add(key)
 
     def __getitem__(self, key: str) -> typing.Any:
         # make use of the custom methods in func:get:
@@ -305,6 +382,8 @@ class ConfigManager:
         key = key.lower()
         if key not in self.all_keys:
             raise InvalidConfigError(f'Configuration "{key}" is invalid.')
+        if convert and key in self._converted:
+            return self._converted[key]
         if key not in self._cache:
             self._cache[key] = deepcopy(self.defaults[key])
         value = self._cache[key]
@@ -314,10 +393,10 @@ class ConfigManager:
 
         if key in self.colors:
             try:
-                return int(value.lstrip("#"), base=16)
+                value = int(value.lstrip("#"), base=16)
             except ValueError:
                 logger.error("Invalid %s provided.", key)
-            value = int(self.remove(key).lstrip("#"), base=16)
+                value = int(self.remove(key).lstrip("#"), base=16)
 
         elif key in self.time_deltas:
             if not isinstance(value, isodate.Duration):
@@ -338,13 +417,12 @@ class ConfigManager:
                 value = self.remove(key)
 
         elif key in self.enums:
-            if value is None:
-                return None
-            try:
-                value = self.enums[key](value)
-            except ValueError:
-                logger.warning("Invalid %s %s.", key, value)
-                value = self.remove(key)
+            if value is not None:
+                try:
+                    value = self.enums[key](value)
+                except ValueError:
+                    logger.warning("Invalid %s %s.", key, value)
+                    value = self.remove(key)
 
         elif key in self.force_str:
             # Temporary: as we saved in int previously, leading to int32 overflow,
@@ -368,6 +446,8 @@ class ConfigManager:
 
             value = new_value
 
+        if key in self.converted_keys:
+            self._converted[key] = value
         return value
 
     async def set(self, key: str, item: typing.Any, convert=True) -> None:
@@ -441,6 +521,8 @@ class ConfigManager:
         if key in self._cache:
             del self._cache[key]
         self._cache[key] = deepcopy(self.defaults[key])
+        self._converted.pop(key, None)
+        self._dirty.add(key)
         return self._cache[key]
 
     def items(self) -> typing.Iterable:
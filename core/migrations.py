@@ -144,7 +144,8 @@ async def migrate_blocklist(bot):
     logger.info("clearing old blocklists")
     bot.blocked_users.clear()
     bot.blocked_roles.clear()
-    await bot.config.update()
+    await bot.config.flush()
+    await bot.blocklist.load()
 
     logger.info(f"Migration complete! skipped {skipped} entries")
     logger.info(f"migrated in {datetime.datetime.utcnow() - start_time}")
@@ -0,0 +1,151 @@
+from typing import Dict, List, Set
+
+from motor.core import AgnosticCollection
+from pymongo import UpdateOne
+
+from core.models import getLogger
+
+logger = getLogger(__name__)
+
+
+class Notifications:
+    """
+    Mentions to send along with the messages of a thread, by thread recipient ID.
+
+    `subscriptions` are mentioned on every message received, while `notification_squad`
+    is only mentioned on the next one. Both are kept in memory so building the
+    mentions of a message doesn't need to query the database.
+    """
+
+    notifications_collection: AgnosticCollection
+
+    def __init__(self, bot) -> None:
+        self.notifications_collection = bot.api.db.notifications
+        self.bot = bot
+        self.subscriptions: Dict[int, List[str]] = {}
+        self.notification_squad: Dict[int, List[str]] = {}
+
+    @property
+    def _bot_id(self) -> str:
+        return str(self.bot.user.id)
+
+    async def setup(self):
+        await self.notifications_collection.create_index([("bot_id", 1), ("recipient_id", 1)], unique=True)
+        await self._migrate_from_config()
+
+        self.subscriptions.clear()
+        self.notification_squad.clear()
+        async for data in self.notifications_collection.find({"bot_id": self._bot_id}):
+            recipient_id = int(data["recipient_id"])
+            if data.get("subscriptions"):
+                self.subscriptions[recipient_id] = data["subscriptions"]
+            if data.get("notification_squad"):
+                self.notification_squad[recipient_id] = data["notification_squad"]
+
+    async def _migrate_from_config(self) -> None:
+        """
+        Moves the mentions that used to be stored in the config to the collection,
+        the mentions of threads that are no longer open are dropped.
+        """
+        legacy = {field: self.bot.config[field] for field in ("subscriptions", "notification_squad")}
+        if not any(legacy.values()):
+            return
+
+        open_ids = await self._get_open_recipient_ids()
+        requests = []
+        dropped = 0
+        for field, notifications in legacy.items():
+            for recipient_id, mentions in notifications.items():
+                if not mentions:
+                    continue
+                if int(recipient_id) not in open_ids:
+                    dropped += 1
+                    continue
+                requests.append(
+                    UpdateOne(
+                        {"bot_id": self._bot_id, "recipient_id": str(recipient_id)},
+                        {"$addToSet": {field: {"$each": mentions}}},
+                        upsert=True,
+                    )
+                )
+
+        logger.info(
+            "Moving %d thread notification(s) out of the config, dropping %d of closed threads.",
+            len(requests),
+            dropped,
+        )
+        if requests:
+            await self.notifications_collection.bulk_write(requests)
+        self.bot.config.remove("subscriptions")
+        self.bot.config.remove("notification_squad")
+        await self.bot.config.flush()
+
+    async def _get_open_recipient_ids(self) -> Set[int]:
+        """The recipient IDs of the threads that have an entry or an open log"""
+        recipient_ids = {int(entry["recipient_id"]) for entry in await self.bot.api.get_thread_entries()}
+        async for log in self.bot.api.logs.find({"open": True}, {"recipient.id": 1}):
+            recipient_ids.add(int(log["recipient"]["id"]))
+        return recipient_ids
+
+    async def _add(self, cache: Dict[int, List[str]], field: str, recipient_id: int, mention: str) -> bool:
+        mentions = cache.setdefault(recipient_id, [])
+        if mention in mentions:
+            return False
+        mentions.append(mention)
+        await self.notifications_collection.update_one(
+            {"bot_id": self._bot_id, "recipient_id": str(recipient_id)},
+            {"$addToSet": {field: mention}},
+            upsert=True,
+        )
+        return True
+
+    async def _remove(self, cache: Dict[int, List[str]], field: str, recipient_id: int, mention: str) -> bool:
+        mentions = cache.get(recipient_id, [])
+        if mention not in mentions:
+            return False
+        mentions.remove(mention)
+        await self.notifications_collection.update_one(
+            {"bot_id": self._bot_id, "recipient_id": str(recipient_id)}, {"$pull": {field: mention}}
+        )
+        return True
+
+    async def add_subscription(self, recipient_id: int, mention: str) -> bool:
+        """Returns whether the mention was added, False if it was already subscribed"""
+        return await self._add(self.subscriptions, "subscriptions", recipient_id, mention)
+
+    async def remove_subscription(self, recipient_id: int, mention: str) -> bool:
+        """Returns whether the mention was removed, False if it wasn't subscribed"""
+        return await self._remove(self.subscriptions, "subscriptions", recipient_id, mention)
+
+    async def add_notification(self, recipient_id: int, mention: str) -> bool:
+        """Returns whether the mention was added, False if it was already going to be notified"""
+        return await self._add(self.notification_squad, "notification_squad", recipient_id, mention)
+
+    async def remove_notification(self, recipient_id: int, mention: str) -> bool:
+        """Returns whether the mention was removed, False if it wasn't going to be notified"""
+        return await self._remove(self.notification_squad, "notification_squad", recipient_id, mention)
+
+    async def get_mentions(self, recipient_id: int) -> List[str]:
+        """
+        Returns the mentions for a message received in a thread,
+        the pending notifications are cleared along the way.
+        """
+        mentions = list(self.subscriptions.get(recipient_id, []))
+
+        notification_squad = self.notification_squad.pop(recipient_id, None)
+        if notification_squad:
+            mentions.extend(notification_squad)
+            # only pull the mentions that were sent, others may have been added since
+            await self.notifications_collection.update_one(
+                {"bot_id": self._bot_id, "recipient_id": str(recipient_id)},
+                {"$pull": {"notification_squad": {"$in": notification_squad}}},
+            )
+        return mentions
+
+    async def clear(self, recipient_id: int) -> None:
+        """Removes all mentions of a thread, once it's closed"""
+        self.subscriptions.pop(recipient_id, None)
+        self.notification_squad.pop(recipient_id, None)
+        await self.notifications_collection.delete_one(
+            {"bot_id": self._bot_id, "recipient_id": str(recipient_id)}
+        )
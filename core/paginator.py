@@ -399,6 +399,54 @@ class EmbedPaginatorSession(PaginatorSession):
         return dict(embed=page)
 
 
+class LazyEmbedPaginatorSession(PaginatorSession):
+    """
+    Class that interactively paginates embed pages, which are only created when shown.
+    This inherits from PaginatorSession.
+
+    Parameters
+    ----------
+    ctx : Context
+        The context of the command.
+    page_count : int
+        The number of pages.
+    get_page : Callable[[int], Awaitable[discord.Embed]]
+        A coroutine function that creates the page at the given index.
+    """
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        page_count: int,
+        get_page: typing.Callable[[int], typing.Awaitable[Embed]],
+        **options,
+    ):
+        super().__init__(ctx, *([None] * page_count), **options)
+        self.get_page = get_page
+
+    async def show_page(self, index: int) -> typing.Optional[typing.Dict]:
+        if 0 <= index < len(self.pages) and self.pages[index] is None:
+            embed = await self.get_page(index)
+            if len(self.pages) > 1:
+                footer_text = f"Page {index + 1} of {len(self.pages)}"
+                if embed.footer.text:
+                    footer_text = footer_text + " • " + embed.footer.text
+
+                if embed.footer.icon:
+                    icon_url = embed.footer.icon.url
+                else:
+                    icon_url = None
+                embed.set_footer(text=footer_text, icon_url=icon_url)
+            self.pages[index] = embed
+        return await super().show_page(index)
+
+    async def _create_base(self, item: Embed, view: View) -> None:
+        self.base = await self.destination.send(embed=item, view=view)
+
+    def _show_page(self, page) -> typing.Dict:
+        return dict(embed=page)
+
+
 class MessagePaginatorSession(PaginatorSession):
     def __init__(self, ctx: commands.Context, *messages, embed: Embed = None, **options):
         self.embed = embed
@@ -1,9 +1,12 @@
 import asyncio
 import copy
+import json
+import os
 import re
 import time
 import typing
 import warnings
+from collections import OrderedDict, deque
 from datetime import timedelta
 
 import discord
@@ -12,8 +15,9 @@ import isodate.duration
 from discord.ext.commands import CommandError, MissingRequiredArgument
 from discord.types.user import PartialUser as PartialUserPayload, User as UserPayload
 
-from core.models import DMDisabled, DummyMessage, getLogger
+from core.models import Default, DMDisabled, DummyMessage, getLogger
 from core.utils import (
+    UID_REGEX,
     AcceptButton,
     ConfirmThreadCreationView,
     DenyButton,
@@ -23,10 +27,9 @@ from core.utils import (
     get_joint_id,
     get_top_role,
     is_image_url,
-    match_title,
-    match_user_id,
     parse_channel_topic,
     truncate,
+    tryint,
 )
 
 logger = getLogger(__name__)
@@ -35,6 +38,9 @@ logger = getLogger(__name__)
 class Thread:
     """Represents a discord Modmail thread"""
 
+    # seconds to wait before mirroring changes to the channel topic
+    TOPIC_UPDATE_DELAY = 5
+
     def __init__(
         self,
         manager: "ThreadManager",
@@ -54,8 +60,17 @@ class Thread:
             self._recipient = recipient
         self._other_recipients = other_recipients or []
         self._channel = channel
+        self._title = None
         self._genesis_message = None
+        self._genesis_message_id = None
+        self._topic_task = None
         self._ready_event = asyncio.Event()
+        # (job, future, time queued) of the messages waiting to be relayed, in the order they were received
+        self._relay_queue = deque()
+        self._relay_task = None
+        self.relay_max_depth = 0
+        self.relay_last_wait = 0.0
+        self.relay_max_wait = 0.0
         self.wait_tasks = []
         self.close_task = None
         self.auto_close_task = None
@@ -81,6 +96,64 @@ class Thread:
 
         self.wait_tasks.remove(task)
 
+    def relay(self, job: typing.Callable[[], typing.Awaitable[typing.Any]]) -> asyncio.Future:
+        """
+        Queues `job` to run once the jobs relayed before it are done, so that messages are
+        delivered to the thread in the order they were queued. Each thread has its own
+        queue, a slow thread never holds up the others.
+
+        Only the part that has to be ordered should be relayed, the queue moves on to the
+        next job as soon as `job` is done.
+
+        Returns a future for the result of `job`, it's cancelled if the thread is
+        cancelled before `job` runs.
+        """
+        future = self.bot.loop.create_future()
+        self._relay_queue.append((job, future, time.perf_counter()))
+        self.relay_max_depth = max(self.relay_max_depth, len(self._relay_queue))
+        if self._relay_task is None or self._relay_task.done():
+            self._relay_task = self.bot.loop.create_task(self._process_relay_queue())
+        return future
+
+    async def _process_relay_queue(self) -> None:
+        future = None
+        try:
+            await self.wait_until_ready()
+            while self._relay_queue:
+                job, future, queued_at = self._relay_queue.popleft()
+                if future.cancelled():
+                    continue
+
+                self.relay_last_wait = time.perf_counter() - queued_at
+                self.relay_max_wait = max(self.relay_max_wait, self.relay_last_wait)
+                logger.debug(
+                    "Relaying message to thread %s after waiting %.3fs, %d more queued.",
+                    self.id,
+                    self.relay_last_wait,
+                    len(self._relay_queue),
+                )
+                try:
+                    result = await job()
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # cancelled while waiting for the thread to be ready, or while relaying,
+            # nothing left in the queue will be relayed
+            if future is not None and not future.done():
+                future.cancel()
+            while self._relay_queue:
+                _, future, _ = self._relay_queue.popleft()
+                future.cancel()
+
+    @property
+    def relay_queue_depth(self) -> int:
+        """The number of messages waiting to be relayed to the thread."""
+        return len(self._relay_queue)
+
     @property
     def id(self) -> int:
         return self._id
@@ -97,6 +170,16 @@ class Thread:
     def recipients(self) -> typing.List[typing.Union[discord.User, discord.Member]]:
         return [self._recipient] + self._other_recipients
 
+    @property
+    def title(self) -> typing.Optional[str]:
+        return self._title
+
+    @property
+    def genesis_message_id(self) -> typing.Optional[int]:
+        if self._genesis_message is not None:
+            return self._genesis_message.id
+        return self._genesis_message_id
+
     @property
     def ready(self) -> bool:
         return self._ready_event.is_set()
@@ -123,29 +206,31 @@ class Thread:
     @classmethod
     async def from_channel(cls, manager: "ThreadManager", channel: discord.TextChannel) -> "Thread":
         # there is a chance it grabs from another recipient's main thread
-        _, recipient_id, other_ids = parse_channel_topic(channel.topic)
+        title, recipient_id, other_ids = parse_channel_topic(channel.topic)
 
         if recipient_id in manager.cache:
             thread = manager.cache[recipient_id]
         else:
-            recipient = await manager.bot.get_or_fetch_user(recipient_id)
-
-            other_recipients = []
-            for uid in other_ids:
-                try:
-                    other_recipient = await manager.bot.get_or_fetch_user(uid)
-                except discord.NotFound:
-                    continue
-                other_recipients.append(other_recipient)
-
+            recipient, other_recipients = await manager._fetch_recipients(recipient_id, other_ids)
             thread = cls(manager, recipient or recipient_id, channel, other_recipients)
+            thread._title = title
 
         return thread
 
     async def get_genesis_message(self) -> discord.Message:
         if isinstance(self._genesis_message, discord.Message):
             return self._genesis_message
-        # TODO: Store genesis message in db and use manual detection for last resort
+
+        if self._genesis_message_id is not None:
+            try:
+                self._genesis_message = await self.channel.fetch_message(self._genesis_message_id)
+            except discord.NotFound:
+                logger.warning("Genesis message of thread channel %s not found.", self.channel.id)
+                self._genesis_message_id = None
+            else:
+                return self._genesis_message
+
+        # threads opened before the genesis message id was stored
         async for m in self.channel.history(limit=5, oldest_first=True):
             if (
                 m.author == self.bot.user
@@ -155,6 +240,10 @@ class Thread:
                 and "user id:" in m.embeds[0].footer.text.lower()
             ):
                 self._genesis_message = m
+
+        if self._genesis_message is not None:
+            self._genesis_message_id = self._genesis_message.id
+            self.bot.loop.create_task(self.save_entry())
         return self._genesis_message
 
     async def setup(self, *, creator=None, category=None, initial_message=None):
@@ -186,6 +275,7 @@ class Thread:
             return
 
         self._channel = channel
+        self.manager.index_thread(self)
 
         try:
             log_url, log_data = await asyncio.gather(
@@ -307,6 +397,12 @@ class Thread:
             activate_auto_triggers(),
             send_persistent_notes(),
         )
+
+        try:
+            await self.save_entry()
+        except Exception:
+            logger.error("An error occurred while saving the thread to the database.", exc_info=True)
+
         self.bot.dispatch("thread_ready", self, creator, category, initial_message)
 
     def _format_info_embed(self, user, log_url, log_count, color):
@@ -399,32 +495,29 @@ class Thread:
     ) -> None:
         """Close a thread now or after a set time in seconds"""
 
-        # restarts the after timer
-        await self.cancel_closure(auto_close)
-
         if after > 0:
-            # TODO: Add somewhere to clean up broken closures
-            #  (when channel is already deleted)
+            # restarts the after timer, the stored closure is replaced below
+            self._cancel_close_tasks(auto_close)
+
+            task = asyncio.create_task(self._close_after(after, closer, silent, delete_channel, message))
+
+            if auto_close:
+                self.auto_close_task = task
+            else:
+                self.close_task = task
+
             now = discord.utils.utcnow()
             items = {
-                # 'initiation_time': now.isoformat(),
-                "time": (now + timedelta(seconds=after)).isoformat(),
+                "time": now + timedelta(seconds=after),
                 "closer_id": closer.id,
                 "silent": silent,
                 "delete_channel": delete_channel,
                 "message": message,
                 "auto_close": auto_close,
             }
-            self.bot.config["closures"][str(self.id)] = items
-            await self.bot.config.update()
-
-            task = asyncio.create_task(self._close_after(after, closer, silent, delete_channel, message))
-
-            if auto_close:
-                self.auto_close_task = task
-            else:
-                self.close_task = task
+            await self.bot.api.update_closure(self.id, items)
         else:
+            await self.cancel_closure(auto_close)
             await self._close(closer, silent, delete_channel, message)
 
     async def _close(self, closer, silent=False, delete_channel=True, message=None, scheduled=False):
@@ -436,6 +529,11 @@ class Thread:
         ):
             return logger.info("Thread auto close cancelled due to disabled thread_auto_close")
 
+        self.manager.unindex_thread(self)
+        self.manager.forget_last_closed_at(self.id)
+        if self._topic_task is not None:
+            self._topic_task.cancel()
+
         try:
             self.manager.cache.pop(self.id)
         except KeyError as e:
@@ -444,10 +542,15 @@ class Thread:
 
         await self.cancel_closure(all=True)
 
-        # Cancel auto closing the thread if closed by any means.
+        if self.relay_max_depth:
+            logger.info(
+                "Thread %s relayed messages with up to %d queued, waiting at most %.3fs.",
+                self.id,
+                self.relay_max_depth,
+                self.relay_max_wait,
+            )
 
-        self.bot.config["subscriptions"].pop(str(self.id), None)
-        self.bot.config["notification_squad"].pop(str(self.id), None)
+        # Cancel auto closing the thread if closed by any means.
 
         # Logging
         if self.channel:
@@ -455,7 +558,7 @@ class Thread:
                 self.channel.id,
                 {
                     "open": False,
-                    "title": match_title(self.channel.topic),
+                    "title": self._title,
                     "closed_at": str(discord.utils.utcnow()),
                     "nsfw": self.channel.nsfw,
                     "close_message": message,
@@ -517,7 +620,11 @@ class Thread:
         embed.set_footer(text=f"{event} by {_closer}", icon_url=closer.display_avatar.url)
         embed.timestamp = discord.utils.utcnow()
 
-        tasks = [self.bot.config.update()]
+        tasks = [self.bot.api.delete_closure(self.id), self.bot.notifications.clear(self.id)]
+
+        if self.channel is not None:
+            tasks.append(self.bot.api.delete_thread_entry(self.channel.id))
+            tasks.append(self.bot.api.delete_message_links(self.channel.id))
 
         if self.bot.log_channel is not None and self.channel is not None:
             if self.bot.config["show_log_url_button"]:
@@ -568,7 +675,7 @@ class Thread:
         await asyncio.gather(*tasks)
         self.bot.dispatch("thread_close", self, closer, silent, delete_channel, message, scheduled)
 
-    async def cancel_closure(self, auto_close: bool = False, all: bool = False) -> None:
+    def _cancel_close_tasks(self, auto_close: bool = False, all: bool = False) -> None:
         if self.close_task is not None and (not auto_close or all):
             self.close_task.cancel()
             self.close_task = None
@@ -576,9 +683,9 @@ class Thread:
             self.auto_close_task.cancel()
             self.auto_close_task = None
 
-        to_update = self.bot.config["closures"].pop(str(self.id), None)
-        if to_update is not None:
-            await self.bot.config.update()
+    async def cancel_closure(self, auto_close: bool = False, all: bool = False) -> None:
+        self._cancel_close_tasks(auto_close, all)
+        await self.bot.api.delete_closure(self.id)
 
     async def _restart_close_timer(self):
         """
@@ -675,9 +782,10 @@ class Thread:
         except ValueError:
             raise ValueError("Malformed thread message.")
 
+        link = await self.manager.get_message_link(message1.id)
         messages = [message1]
         for user in self.recipients:
-            async for msg in user.history():
+            async for msg in self._linked_history(user, link, user.id):
                 if either_direction:
                     if msg.id == joint_id:
                         return message1, msg
@@ -749,9 +857,10 @@ class Thread:
             # could be None too, if that's the case we'll reassign this variable from
             # thread message we fetch in the next step
 
+        link = await self.manager.get_message_link(message.id)
         linked_messages = []
         if self.channel is not None:
-            async for msg in self.channel.history():
+            async for msg in self._linked_history(self.channel, link):
                 if not msg.embeds:
                     continue
 
@@ -785,7 +894,7 @@ class Thread:
         for user in self.recipients:
             if user.dm_channel == message.channel:
                 continue
-            async for other_msg in user.history():
+            async for other_msg in self._linked_history(user, link, user.id):
                 if either_direction:
                     if other_msg.id == joint_id:
                         linked_messages.append(other_msg)
@@ -803,6 +912,76 @@ class Thread:
 
         return linked_messages
 
+    async def _linked_history(
+        self,
+        destination: discord.abc.Messageable,
+        link: typing.Optional[dict],
+        recipient_id: int = None,
+    ) -> typing.AsyncIterator[discord.Message]:
+        """
+        Yields the messages in the thread channel, or in the DM of a recipient,
+        that may be linked to a relayed message.
+
+        When the link was recorded that is only the linked message itself,
+        messages relayed before links were recorded are searched for in the history.
+        """
+        if link is None:
+            async for msg in destination.history():
+                yield msg
+            return
+
+        if recipient_id is None:
+            message_id = link["thread_message_id"]
+        else:
+            message_id = link["dm_message_ids"].get(recipient_id)
+            if message_id is None:
+                return
+
+        try:
+            msg = await destination.fetch_message(message_id)
+        except discord.NotFound:
+            return
+        yield msg
+
+    def link_messages(
+        self,
+        message: discord.Message,
+        thread_message: discord.Message,
+        dm_messages: typing.Dict[int, discord.Message],
+    ) -> None:
+        """
+        Records the messages a message was relayed as, so that edits, deletions and
+        reactions can find them directly instead of searching the channel histories.
+
+        Parameters
+        ----------
+        message : discord.Message
+            The original message.
+        thread_message : discord.Message
+            The message sent to the thread channel.
+        dm_messages : Dict[int, discord.Message]
+            The message in the DM of each recipient, by recipient ID.
+        """
+        dm_message_ids = {uid: m.id for uid, m in dm_messages.items()}
+        message_ids = list(dict.fromkeys([message.id, thread_message.id, *dm_message_ids.values()]))
+        self.manager.cache_message_link(
+            {
+                "thread_message_id": thread_message.id,
+                "dm_message_ids": dm_message_ids,
+                "message_ids": message_ids,
+            }
+        )
+        self.bot.loop.create_task(
+            self.bot.api.create_message_link(
+                self.channel.id,
+                {
+                    "thread_message_id": str(thread_message.id),
+                    "dm_message_ids": {str(uid): str(mid) for uid, mid in dm_message_ids.items()},
+                    "message_ids": [str(mid) for mid in message_ids],
+                },
+            )
+        )
+
     async def edit_dm_message(self, message: discord.Message, content: str) -> None:
         try:
             linked_messages = await self.find_linked_message_from_dm(message)
@@ -855,8 +1034,9 @@ class Thread:
 
         user_msg_tasks = []
         tasks = []
+        recipients = self.recipients
 
-        for user in self.recipients:
+        for user in recipients:
             user_msg_tasks.append(
                 self.send(
                     message,
@@ -896,6 +1076,7 @@ class Thread:
             msg = await self.send(
                 message, destination=self.channel, from_mod=True, anonymous=anonymous, plain=plain
             )
+            self.link_messages(message, msg, {u.id: m for u, m in zip(recipients, user_msg)})
 
             tasks.append(
                 self.bot.api.append_log(
@@ -1164,36 +1345,66 @@ class Thread:
             msg = await destination.send(mentions, embed=embed)
 
         if additional_images:
-            self.ready = False
             await asyncio.gather(*additional_images)
-            self.ready = True
 
         return msg
 
     async def get_notifications(self) -> str:
-        key = str(self.id)
-
-        mentions = []
-        mentions.extend(self.bot.config["subscriptions"].get(key, []))
-
-        if key in self.bot.config["notification_squad"]:
-            mentions.extend(self.bot.config["notification_squad"][key])
-            self.bot.config["notification_squad"].pop(key)
-            self.bot.loop.create_task(self.bot.config.update())
-
+        mentions = await self.bot.notifications.get_mentions(self.id)
         return " ".join(set(mentions))
 
-    async def set_title(self, title: str, channel_id: int) -> None:
-        topic = f"Title: {title}\n"
+    async def save_entry(self) -> None:
+        """Stores the thread in the database, this is the source of truth for thread state."""
+        other_ids = [str(u.id) for u in self._other_recipients]
+        genesis_message_id = self.genesis_message_id
+        await self.bot.api.update_thread_entry(
+            self.channel.id,
+            {
+                "recipient_id": str(self.id),
+                "recipient_ids": [str(self.id), *other_ids],
+                "other_recipients": other_ids,
+                "title": self._title,
+                "genesis_message_id": str(genesis_message_id) if genesis_message_id else None,
+            },
+        )
 
-        user_id = match_user_id(self.channel.topic)
-        topic += f"User ID: {user_id}"
+    def _format_topic(self) -> str:
+        topic = ""
+        if self._title is not None:
+            topic += f"Title: {self._title}\n"
+
+        topic += f"User ID: {self._id}"
 
         if self._other_recipients:
             ids = ",".join(str(i.id) for i in self._other_recipients)
             topic += f"\nOther Recipients: {ids}"
+        return topic
 
-        await asyncio.gather(self.channel.edit(topic=topic), self.bot.api.update_title(title, channel_id))
+    def update_topic(self) -> None:
+        """
+        Mirrors the thread state to the channel topic.
+
+        Discord heavily rate limits topic edits, so the edit is delayed
+        and changes made in the meantime are written at once.
+        """
+        # the pending edit formats the topic when it fires, restarting it
+        # would keep delaying it for as long as updates keep coming
+        if self._topic_task is None or self._topic_task.done():
+            self._topic_task = self.bot.loop.create_task(self._update_topic())
+
+    async def _update_topic(self) -> None:
+        await asyncio.sleep(self.TOPIC_UPDATE_DELAY)
+        # changes made while the edit is sent need an edit of their own
+        self._topic_task = None
+        try:
+            await self.channel.edit(topic=self._format_topic())
+        except discord.HTTPException as e:
+            logger.warning("Failed to update the topic of thread channel %s: %s.", self.channel.id, e)
+
+    async def set_title(self, title: str, channel_id: int) -> None:
+        self._title = title
+        self.update_topic()
+        await asyncio.gather(self.save_entry(), self.bot.api.update_title(title, channel_id))
 
     async def set_nsfw_status(self, nsfw: bool) -> None:
         await asyncio.gather(self.channel.edit(nsfw=nsfw), self.bot.api.update_nsfw(nsfw, self.channel.id))
@@ -1219,52 +1430,106 @@ class Thread:
         await genesis_message.edit(embed=embed)
 
     async def add_users(self, users: typing.List[typing.Union[discord.Member, discord.User]]) -> None:
-        topic = ""
-        title, _, _ = parse_channel_topic(self.channel.topic)
-        if title is not None:
-            topic += f"Title: {title}\n"
-
-        topic += f"User ID: {self._id}"
-
         self._other_recipients += users
         self._other_recipients = list(set(self._other_recipients))
+        self.manager.index_thread(self)
 
-        ids = ",".join(str(i.id) for i in self._other_recipients)
-
-        topic += f"\nOther Recipients: {ids}"
-
-        await self.channel.edit(topic=topic)
+        self.update_topic()
+        await self.save_entry()
         await self._update_users_genesis()
 
     async def remove_users(self, users: typing.List[typing.Union[discord.Member, discord.User]]) -> None:
-        topic = ""
-        title, user_id, _ = parse_channel_topic(self.channel.topic)
-        if title is not None:
-            topic += f"Title: {title}\n"
-
-        topic += f"User ID: {user_id}"
-
         for u in users:
             self._other_recipients.remove(u)
+        self.manager._unindex_recipients([u.id for u in users], self.channel.id)
 
-        if self._other_recipients:
-            ids = ",".join(str(i.id) for i in self._other_recipients)
-            topic += f"\nOther Recipients: {ids}"
-
-        await self.channel.edit(topic=topic)
+        self.update_topic()
+        await self.save_entry()
         await self._update_users_genesis()
 
 
 class ThreadManager:
     """Class that handles storing, finding and creating Modmail threads."""
 
+    # bounds for the cache of DM senders that are known to have no open thread
+    NO_THREAD_CACHE_SIZE = 1000
+    NO_THREAD_CACHE_TTL = 300
+    # number of message ids whose links are kept in memory
+    MESSAGE_LINK_CACHE_SIZE = 3000
+
     def __init__(self, bot):
         self.bot = bot
         self.cache = {}
+        # channel id -> Thread, so that channel lookups don't need to parse topics
+        self.channel_cache = {}
+        # recipient id (including other recipients) -> thread channel id
+        self.recipient_index = {}
+        self._recipient_index_built = False
+        # recipient id -> (expiry, closing time of their latest thread), for users without a thread
+        self._no_thread_cache = OrderedDict()
+        # message id -> link of the relayed message it belongs to, see `Thread.link_messages`
+        self._message_link_cache = OrderedDict()
 
     async def populate_cache(self) -> None:
-        for channel in self.bot.modmail_guild.text_channels:
-            await self.find(channel=channel)
+        start = time.perf_counter()
+
+        # thread entries are the source of truth, topics are only used for
+        # threads opened before the threads collection existed
+        entries = {}
+        for entry in await self.bot.api.get_thread_entries():
+            entries[int(entry["channel_id"])] = entry
+
+        stale = [channel_id for channel_id in entries if self.bot.get_channel(channel_id) is None]
+        if stale:
+            logger.info("Removing %d thread entries of deleted channels.", len(stale))
+            await asyncio.gather(*(self.bot.api.delete_thread_entry(channel_id) for channel_id in stale))
+            for channel_id in stale:
+                del entries[channel_id]
+
+        self.build_recipient_index(entries.values())
+
+        restored = self.load_snapshot(entries)
+        if restored:
+            logger.info("Restored %d thread(s) from the thread cache snapshot.", restored)
+
+        thread_channel_ids = set(self.recipient_index.values()).difference(self.channel_cache)
+        channels = [c for c in self.bot.modmail_guild.text_channels if c.id in thread_channel_ids]
+        total = len(channels)
+
+        concurrency = tryint(self.bot.config["thread_cache_concurrency"])
+        if not isinstance(concurrency, int) or concurrency < 1:
+            logger.warning("Invalid THREAD_CACHE_CONCURRENCY set, using the default.")
+            concurrency = self.bot.config.remove("thread_cache_concurrency")
+
+        # Fetching uncached users goes through the REST API, bound the number of
+        # channels resolved at once so startup doesn't run into the rate limits.
+        semaphore = asyncio.Semaphore(concurrency)
+        loaded = 0
+
+        async def populate(channel):
+            nonlocal loaded
+            async with semaphore:
+                try:
+                    entry = entries.get(channel.id)
+                    if entry is not None:
+                        await self.restore_from_entry(channel, entry)
+                    else:
+                        thread = await self.find(channel=channel)
+                        if thread is not None and thread.channel == channel:
+                            await thread.save_entry()
+                except discord.HTTPException as e:
+                    logger.warning("Failed to load thread from channel %s: %s.", channel.id, e)
+            loaded += 1
+            if loaded % 100 == 0 and loaded != total:
+                logger.info("Loaded %d/%d thread channels.", loaded, total)
+
+        logger.info("Loading %d thread channel(s), %d at a time.", total, concurrency)
+        await asyncio.gather(*(populate(c) for c in channels))
+        logger.info(
+            "Populated thread cache with %d thread(s) in %.2f seconds.",
+            len(self.cache),
+            time.perf_counter() - start,
+        )
 
     def __len__(self):
         return len(self.cache)
@@ -1275,6 +1540,231 @@ class ThreadManager:
     def __getitem__(self, item: str) -> Thread:
         return self.cache[item]
 
+    def get_last_closed_at(self, recipient_id: int) -> typing.Optional[str]:
+        """
+        Returns the cached closing time of the latest thread of a recipient
+        known to have no open thread, or `Default` if it isn't cached.
+        """
+        entry = self._no_thread_cache.get(recipient_id)
+        if entry is None:
+            return Default
+        expires_at, closed_at = entry
+        if expires_at < time.monotonic():
+            del self._no_thread_cache[recipient_id]
+            return Default
+        return closed_at
+
+    def cache_last_closed_at(self, recipient_id: int, closed_at: typing.Optional[str]) -> None:
+        """Remembers that the recipient has no open thread, along with when their latest one closed."""
+        self._no_thread_cache[recipient_id] = (time.monotonic() + self.NO_THREAD_CACHE_TTL, closed_at)
+        self._no_thread_cache.move_to_end(recipient_id)
+        while len(self._no_thread_cache) > self.NO_THREAD_CACHE_SIZE:
+            self._no_thread_cache.popitem(last=False)
+
+    def forget_last_closed_at(self, recipient_id: int) -> None:
+        self._no_thread_cache.pop(recipient_id, None)
+
+    def cache_message_link(self, link: dict) -> None:
+        for message_id in link["message_ids"]:
+            self._message_link_cache[message_id] = link
+            self._message_link_cache.move_to_end(message_id)
+        while len(self._message_link_cache) > self.MESSAGE_LINK_CACHE_SIZE:
+            self._message_link_cache.popitem(last=False)
+
+    async def get_message_link(self, message_id: int) -> typing.Optional[dict]:
+        """
+        Returns the link of a relayed message from the ID of any message it was
+        relayed as, or None if it wasn't recorded.
+        """
+        link = self._message_link_cache.get(message_id)
+        if link is None:
+            entry = await self.bot.api.get_message_link(message_id)
+            if entry is None:
+                return None
+            link = {
+                "thread_message_id": int(entry["thread_message_id"]),
+                "dm_message_ids": {int(k): int(v) for k, v in entry["dm_message_ids"].items()},
+                "message_ids": [int(i) for i in entry["message_ids"]],
+            }
+        self.cache_message_link(link)
+        return link
+
+    def save_snapshot(self) -> None:
+        """Writes the open threads to disk so the next startup doesn't have to resolve them again."""
+        threads = []
+        for thread in self.cache.values():
+            if thread.channel is None or not thread.ready or thread.cancelled:
+                continue
+            threads.append(
+                {
+                    "recipient_id": thread.id,
+                    "channel_id": thread.channel.id,
+                    "other_recipient_ids": [u.id for u in thread._other_recipients],
+                    "genesis_message_id": thread.genesis_message_id,
+                    "title": thread.title,
+                }
+            )
+
+        path = self.bot.thread_snapshot_path
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"guild_id": self.bot.modmail_guild.id, "threads": threads}, f)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            logger.warning("Failed to write thread cache snapshot.", exc_info=True)
+        else:
+            logger.debug("Saved %d thread(s) to the thread cache snapshot.", len(threads))
+
+    def load_snapshot(self, entries: typing.Dict[int, dict]) -> int:
+        """
+        Restores threads from the snapshot written by `save_snapshot`.
+
+        The snapshot can be older than the thread entries, so a thread is only restored
+        when its recipients are the same as in its entry, or in the recipient index for
+        threads without an entry, and every recipient is in the gateway cache.
+        The title and genesis message are taken from the entry. The rest are left to
+        be resolved as usual.
+
+        Parameters
+        ----------
+        entries : Dict[int, dict]
+            The thread entries by channel ID.
+
+        Returns
+        -------
+        int
+            The number of threads restored.
+        """
+        try:
+            with open(self.bot.thread_snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            logger.warning("Failed to read thread cache snapshot.", exc_info=True)
+            return 0
+
+        if snapshot.get("guild_id") != self.bot.modmail_guild.id:
+            logger.debug("Ignoring thread cache snapshot from another guild.")
+            return 0
+
+        indexed_ids = {}
+        for uid, channel_id in self.recipient_index.items():
+            indexed_ids.setdefault(channel_id, set()).add(uid)
+
+        restored = 0
+        for snapshot_entry in snapshot.get("threads", []):
+            channel = self.bot.get_channel(snapshot_entry["channel_id"])
+            user_id = snapshot_entry["recipient_id"]
+            if not isinstance(channel, discord.TextChannel) or user_id in self.cache:
+                continue
+
+            other_ids = snapshot_entry["other_recipient_ids"]
+            title = snapshot_entry.get("title")
+            genesis_message_id = snapshot_entry.get("genesis_message_id")
+
+            entry = entries.get(channel.id)
+            if entry is not None:
+                entry_other_ids = {int(uid) for uid in entry["other_recipients"]}
+                if int(entry["recipient_id"]) != user_id or entry_other_ids != set(other_ids):
+                    continue
+                title = entry.get("title")
+                genesis_message_id = tryint(entry.get("genesis_message_id"))
+            elif indexed_ids.get(channel.id) != {user_id, *other_ids}:
+                continue
+
+            recipient = self.bot.get_user(user_id)
+            other_recipients = [self.bot.get_user(uid) for uid in other_ids]
+            if recipient is None or None in other_recipients:
+                continue
+
+            self.cache[user_id] = thread = Thread(self, recipient, channel, other_recipients)
+            thread._title = title
+            thread._genesis_message_id = genesis_message_id
+            self.index_thread(thread)
+            thread.ready = True
+            restored += 1
+
+        return restored
+
+    def build_recipient_index(self, entries: typing.Iterable[dict] = ()) -> None:
+        """
+        Builds the recipient index from the thread entries stored in the database,
+        falling back to the topics of the other channels in the Modmail guild.
+        """
+        self.recipient_index.clear()
+        indexed = set()
+        for entry in entries:
+            channel_id = int(entry["channel_id"])
+            for uid in entry["recipient_ids"]:
+                self.recipient_index[int(uid)] = channel_id
+            indexed.add(channel_id)
+
+        for channel in self.bot.modmail_guild.text_channels:
+            if channel.id not in indexed:
+                self.index_channel(channel)
+        self._recipient_index_built = True
+        logger.debug("Indexed %d thread recipient(s).", len(self.recipient_index))
+
+    def index_thread(self, thread: Thread) -> None:
+        """Adds the thread and its recipients to the lookup indexes."""
+        self.forget_last_closed_at(thread.id)
+        if thread.channel is not None:
+            self.channel_cache[thread.channel.id] = thread
+            self.recipient_index[thread.id] = thread.channel.id
+            for user in thread._other_recipients:
+                self.recipient_index[user.id] = thread.channel.id
+
+    def unindex_thread(self, thread: Thread) -> None:
+        """Removes the thread and its recipients from the lookup indexes."""
+        if thread.channel is not None:
+            if self.channel_cache.get(thread.channel.id) is thread:
+                del self.channel_cache[thread.channel.id]
+            self._unindex_recipients(
+                [thread.id, *(user.id for user in thread._other_recipients)], thread.channel.id
+            )
+
+    def index_channel(self, channel: discord.TextChannel) -> None:
+        """Adds the recipients listed in a channel topic to the recipient index."""
+        _, user_id, other_ids = parse_channel_topic(channel.topic)
+        if user_id == -1:
+            return
+        for uid in (user_id, *other_ids):
+            self.recipient_index[uid] = channel.id
+
+    def may_be_thread_channel(self, channel: discord.abc.Messageable) -> bool:
+        """
+        Whether a channel is a thread channel, or could be one that isn't loaded yet,
+        without any lookup. Used to skip messages that can't be relevant to a thread.
+        """
+        if channel.id in self.channel_cache:
+            return True
+        topic = getattr(channel, "topic", None)
+        return bool(topic) and UID_REGEX.search(topic) is not None
+
+    def reindex_channel(self, before: discord.TextChannel, after: discord.TextChannel) -> None:
+        """Updates the recipient index after a channel topic has changed."""
+        if after.id in self.channel_cache:
+            # the topic only mirrors the state of loaded threads
+            return
+        _, user_id, other_ids = parse_channel_topic(before.topic)
+        self._unindex_recipients([user_id, *other_ids], before.id)
+        self.index_channel(after)
+
+    def unindex_channel(self, channel: discord.TextChannel) -> None:
+        """Removes a deleted channel from the lookup indexes."""
+        thread = self.channel_cache.get(channel.id)
+        if thread is not None:
+            self.unindex_thread(thread)
+        _, user_id, other_ids = parse_channel_topic(channel.topic)
+        self._unindex_recipients([user_id, *other_ids], channel.id)
+
+    def _unindex_recipients(self, user_ids: typing.Iterable[int], channel_id: int) -> None:
+        for uid in user_ids:
+            # only drop the entry if it wasn't since claimed by another channel
+            if self.recipient_index.get(uid) == channel_id:
+                del self.recipient_index[uid]
+
     async def find(
         self,
         *,
@@ -1284,15 +1774,13 @@ class ThreadManager:
     ) -> typing.Optional[Thread]:
         """Finds a thread from cache or from discord channel topics."""
         if recipient is None and channel is not None and isinstance(channel, discord.TextChannel):
-            thread = await self._find_from_channel(channel)
-            if thread is None:
-                user_id, thread = next(
-                    ((k, v) for k, v in self.cache.items() if v.channel == channel), (-1, None)
-                )
-                if thread is not None:
+            thread = self.channel_cache.get(channel.id)
+            if thread is not None:
+                if not channel.topic or str(thread.id) not in channel.topic:
                     logger.debug("Found thread with tempered ID.")
-                    await channel.edit(topic=f"User ID: {user_id}")
-            return thread
+                    thread.update_topic()
+                return thread
+            return await self._find_from_channel(channel)
 
         if recipient:
             recipient_id = recipient.id
@@ -1312,25 +1800,23 @@ class ThreadManager:
                     await thread.close(closer=self.bot.user, silent=True, delete_channel=False)
                     thread = None
         else:
+            if not self._recipient_index_built:
+                self.build_recipient_index()
+
+            channel = None
+            channel_id = self.recipient_index.get(recipient_id)
+            if channel_id is not None:
+                channel = self.bot.get_channel(channel_id)
+                if channel is None:
+                    logger.debug("Removing stale recipient index entry for %s.", recipient_id)
+                    self.recipient_index.pop(recipient_id)
+                else:
+                    thread = self.channel_cache.get(channel_id)
 
-            def check(topic):
-                _, user_id, other_ids = parse_channel_topic(topic)
-                return recipient_id == user_id or recipient_id in other_ids
-
-            channel = discord.utils.find(
-                lambda x: (check(x.topic)) if x.topic else False,
-                self.bot.modmail_guild.text_channels,
-            )
-
-            if channel:
-                thread = await Thread.from_channel(self, channel)
-                if thread.recipient:
-                    # only save if data is valid.
-                    # also the recipient_id here could belong to other recipient,
-                    # it would be wrong if we set it as the dict key,
-                    # so we use the thread id instead
-                    self.cache[thread.id] = thread
-                thread.ready = True
+            if thread is None and channel is not None:
+                # the recipient_id here could belong to other recipient,
+                # the thread is cached by its own id
+                thread = await self._find_from_channel(channel)
 
         if thread and recipient_id not in [x.id for x in thread.recipients]:
             self.cache.pop(recipient_id)
@@ -1340,44 +1826,88 @@ class ThreadManager:
 
     async def _find_from_channel(self, channel):
         """
-        Tries to find a thread from a channel channel topic,
-        if channel topic doesnt exist for some reason, falls back to
-        searching channel history for genesis embed and
-        extracts user_id from that.
+        Tries to find a thread from the thread entry of a channel, the channel
+        topic is only parsed for threads that have no entry since it may lag
+        behind the entry.
         """
 
+        entry = await self.bot.api.get_thread_entry(channel.id)
+        if entry is not None:
+            thread = await self.restore_from_entry(channel, entry)
+            self.index_thread(thread)
+            return thread
+
         if not channel.topic:
             return None
 
-        _, user_id, other_ids = parse_channel_topic(channel.topic)
+        title, user_id, other_ids = parse_channel_topic(channel.topic)
 
         if user_id == -1:
             return None
 
+        if user_id in self.cache:
+            thread = self.cache[user_id]
+            self.index_thread(thread)
+            return thread
+
+        return await self._restore_thread(channel, user_id, other_ids, title=title)
+
+    async def restore_from_entry(self, channel: discord.TextChannel, entry: dict) -> Thread:
+        """Loads a thread from its entry in the database."""
+        user_id = int(entry["recipient_id"])
         if user_id in self.cache:
             return self.cache[user_id]
 
-        try:
-            recipient = await self.bot.get_or_fetch_user(user_id)
-        except discord.NotFound:
-            recipient = None
+        return await self._restore_thread(
+            channel,
+            user_id,
+            [int(uid) for uid in entry["other_recipients"]],
+            title=entry.get("title"),
+            genesis_message_id=tryint(entry.get("genesis_message_id")),
+        )
 
-        other_recipients = []
-        for uid in other_ids:
-            try:
-                other_recipient = await self.bot.get_or_fetch_user(uid)
-            except discord.NotFound:
-                continue
-            other_recipients.append(other_recipient)
+    async def _restore_thread(
+        self,
+        channel: discord.TextChannel,
+        user_id: int,
+        other_ids: typing.List[int],
+        *,
+        title: str = None,
+        genesis_message_id: int = None,
+    ) -> Thread:
+        recipient, other_recipients = await self._fetch_recipients(user_id, other_ids)
 
         if recipient is None:
             thread = Thread(self, user_id, channel, other_recipients)
         else:
             self.cache[user_id] = thread = Thread(self, recipient, channel, other_recipients)
+        thread._title = title
+        thread._genesis_message_id = genesis_message_id
+        self.index_thread(thread)
         thread.ready = True
 
         return thread
 
+    async def _fetch_recipients(
+        self, user_id: int, other_ids: typing.List[int]
+    ) -> typing.Tuple[
+        typing.Optional[typing.Union[discord.User, discord.Member]],
+        typing.List[typing.Union[discord.User, discord.Member]],
+    ]:
+        """
+        Retrieves the recipient and other recipients of a thread concurrently,
+        users that no longer exist are returned as None or left out respectively.
+        """
+
+        async def fetch(uid):
+            try:
+                return await self.bot.get_or_fetch_user(uid)
+            except discord.NotFound:
+                return None
+
+        recipient, *other_recipients = await asyncio.gather(*(fetch(uid) for uid in (user_id, *other_ids)))
+        return recipient, [u for u in other_recipients if u is not None]
+
     async def create(
         self,
         recipient: typing.Union[discord.Member, discord.User],
@@ -1409,6 +1939,7 @@ class ThreadManager:
         thread = Thread(self, recipient)
 
         self.cache[recipient.id] = thread
+        self.forget_last_closed_at(recipient.id)
 
         if (message or not manual_trigger) and self.bot.config["confirm_thread_creation"]:
             if not manual_trigger:
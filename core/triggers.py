@@ -0,0 +1,161 @@
+import re
+import typing
+
+from core.models import getLogger
+
+logger = getLogger(__name__)
+
+# regex syntax that can't be wrapped in a named group of a combined pattern:
+# inline flags, named groups and backreferences
+_UNCOMBINABLE = re.compile(r"\(\?(?![:=!]|<[=!])|\\[1-9]")
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton to find which of many words appear in a text in a single pass.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The words to look for, their position is their priority.
+    """
+
+    def __init__(self, words: typing.Iterable[str]):
+        self._goto: typing.List[typing.Dict[str, int]] = [{}]
+        # index of the first word ending at each node, following the fail links
+        self._best: typing.List[typing.Optional[int]] = [None]
+
+        for index, word in enumerate(words):
+            node = 0
+            for char in word:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._best.append(None)
+                node = next_node
+            if self._best[node] is None:
+                self._best[node] = index
+
+        # breadth first, so the fail node of a node is always complete before it
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, next_node in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                self._best[next_node] = self._min(self._best[next_node], self._best[self._fail[next_node]])
+                queue.append(next_node)
+
+    @staticmethod
+    def _min(a: typing.Optional[int], b: typing.Optional[int]) -> typing.Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def search(self, text: str) -> typing.Optional[int]:
+        """Returns the index of the first word that appears in the text, or None."""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = best[0]
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if best[node] is not None:
+                found = self._min(found, best[node])
+                if found == 0:
+                    break
+        return found
+
+
+class AutoTriggerMatcher:
+    """
+    The auto trigger keywords compiled to find the trigger of a message in a single pass.
+
+    Keywords are matched case-insensitively as substrings, the first keyword found wins.
+    With `regex`, keywords are combined into a single pattern of ordered lookaheads
+    anchored at the start of the message, so the first keyword found still wins.
+
+    Parameters
+    ----------
+    keywords : Iterable[str]
+        The auto trigger keywords, in order of priority.
+    regex : bool
+        Whether the keywords are regular expressions.
+    """
+
+    def __init__(self, keywords: typing.Iterable[str], regex: bool):
+        self.keywords = list(keywords)
+        self.regex = regex
+
+        self._automaton = None
+        self._pattern = None
+        # (index, pattern) of the keywords that can't be part of the combined pattern
+        self._patterns: typing.List[typing.Tuple[int, typing.Pattern]] = []
+
+        if not regex:
+            self._automaton = AhoCorasick(keyword.lower() for keyword in self.keywords)
+            return
+
+        combined = []
+        for index, keyword in enumerate(self.keywords):
+            try:
+                pattern = re.compile(keyword)
+            except re.error:
+                logger.warning("Invalid autotrigger regex %s, ignoring.", keyword)
+                continue
+            if _UNCOMBINABLE.search(keyword):
+                self._patterns.append((index, pattern))
+            else:
+                combined.append((index, pattern))
+        if not combined:
+            return
+
+        try:
+            # the alternatives are tried in order at position 0, each looking ahead for its keyword
+            self._pattern = re.compile(
+                "^(?:" + "|".join(rf"(?=[\s\S]*?(?P<_{index}>{p.pattern}))" for index, p in combined) + ")"
+            )
+        except re.error:
+            logger.warning("Failed to combine the autotrigger regexes, matching them one by one.")
+            self._patterns = sorted(self._patterns + combined, key=lambda item: item[0])
+
+    def match(self, text: str) -> typing.Optional[typing.Tuple[str, str]]:
+        """
+        Finds the auto trigger of a message.
+
+        Returns
+        -------
+        Optional[Tuple[str, str]]
+            The keyword and the part of the text it matched, or None if no keyword matched.
+        """
+        if not self.regex:
+            index = self._automaton.search(text.lower())
+            if index is None:
+                return None
+            keyword = self.keywords[index]
+            return keyword, keyword.lower()
+
+        found = None
+        if self._pattern is not None:
+            match = self._pattern.match(text)
+            if match is not None:
+                found = int(match.lastgroup[1:]), match.group(match.lastgroup)
+        for index, pattern in self._patterns:
+            if found is not None and found[0] < index:
+                break
+            match = pattern.search(text)
+            if match is not None:
+                found = index, match.group(0)
+                break
+        if found is None:
+            return None
+
+        index, invoker = found
+        return self.keywords[index], invoker
@@ -1,11 +1,13 @@
 import base64
+import bisect
 import functools
 import re
 import typing
+from collections import Counter
 from datetime import datetime, timezone
 from difflib import get_close_matches
 from distutils.util import strtobool as _stb  # pylint: disable=import-error
-from itertools import takewhile, zip_longest
+from itertools import takewhile
 from urllib import parse
 
 import discord
@@ -16,6 +18,7 @@ from core.models import getLogger
 __all__ = [
     "strtobool",
     "User",
+    "UserOrRoleID",
     "truncate",
     "format_preview",
     "is_image_url",
@@ -28,8 +31,11 @@ __all__ = [
     "match_user_id",
     "match_other_recipients",
     "create_thread_channel",
+    "SuggestionIndex",
     "create_not_found_embed",
     "parse_alias",
+    "compile_alias",
+    "apply_alias_args",
     "normalize_alias",
     "format_description",
     "trigger_typing",
@@ -84,6 +90,31 @@ class User(commands.MemberConverter):
         return discord.Object(int(match.group(1)))
 
 
+class UserOrRoleID(commands.Converter):
+    """
+    A custom discord.py `Converter` for users and roles given by ID or mention.
+
+    Names are not looked up, so a `Greedy` list of these stops at the
+    first word that isn't an ID or a mention, such as the start of a reason.
+    """
+
+    ID_REGEX = re.compile(r"<@(?P<type>[!&]?)(?P<mention_id>\d{15,21})>|(?P<id>\d{15,21})")
+
+    async def convert(self, ctx, argument):
+        match = self.ID_REGEX.fullmatch(argument)
+        if match is None:
+            raise commands.BadArgument(f'"{argument}" is not the ID or mention of a user or role')
+
+        if match.group("type") == "&":
+            return await commands.RoleConverter().convert(ctx, argument)
+        if match.group("mention_id") is None:
+            try:
+                return await commands.RoleConverter().convert(ctx, argument)
+            except commands.BadArgument:
+                pass
+        return await commands.UserConverter().convert(ctx, argument)
+
+
 def truncate(text: str, max: int = 50) -> str:  # pylint: disable=redefined-builtin
     """
     Reduces the string to `max` length, by trimming the message into "...".
@@ -341,12 +372,85 @@ def match_other_recipients(text: str) -> typing.List[int]:
     return parse_channel_topic(text)[2]
 
 
+class SuggestionIndex:
+    """
+    Trigram index of names, to suggest the closest names to a misspelled one
+    without comparing it to every name.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The names to index.
+    """
+
+    # names sharing the most trigrams with the word that are compared to it
+    CANDIDATES = 25
+
+    def __init__(self, words: typing.Iterable[str] = ()):
+        self._words: typing.Set[str] = set()
+        self._postings: typing.Dict[str, typing.Set[str]] = {}
+        self._sorted: typing.Optional[typing.List[str]] = None
+        self.sync(words)
+
+    @staticmethod
+    def _trigrams(word: str) -> typing.Set[str]:
+        padded = f"  {word.lower()} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, word: str) -> None:
+        if word in self._words:
+            return
+        self._words.add(word)
+        for trigram in self._trigrams(word):
+            self._postings.setdefault(trigram, set()).add(word)
+        self._sorted = None
+
+    def remove(self, word: str) -> None:
+        if word not in self._words:
+            return
+        self._words.remove(word)
+        for trigram in self._trigrams(word):
+            postings = self._postings[trigram]
+            postings.discard(word)
+            if not postings:
+                del self._postings[trigram]
+        self._sorted = None
+
+    def sync(self, words: typing.Iterable[str]) -> None:
+        """Adds and removes names so that the index only has `words`."""
+        words = set(words)
+        if words == self._words:
+            return
+        for word in self._words - words:
+            self.remove(word)
+        for word in words - self._words:
+            self.add(word)
+
+    def suggest(self, word: str, n: int = 2, cutoff: float = 0.6) -> typing.List[str]:
+        """The closest names to `word`, as `difflib.get_close_matches` would find them."""
+        counts = Counter()
+        for trigram in self._trigrams(word):
+            counts.update(self._postings.get(trigram, ()))
+        candidates = [candidate for candidate, _ in counts.most_common(self.CANDIDATES)]
+        return get_close_matches(word, candidates, n=n, cutoff=cutoff)
+
+    def complete(self, prefix: str, limit: int = 25) -> typing.List[str]:
+        """The names starting with `prefix` in alphabetical order, for autocompletion."""
+        if self._sorted is None:
+            self._sorted = sorted(self._words)
+        start = bisect.bisect_left(self._sorted, prefix)
+        return list(takewhile(lambda w: w.startswith(prefix), self._sorted[start : start + limit]))
+
+
 def create_not_found_embed(word, possibilities, name, n=2, cutoff=0.6) -> discord.Embed:
     # Single reference of Color.red()
     embed = discord.Embed(
         color=discord.Color.red(), description=f"**{name.capitalize()} `{word}` cannot be found.**"
     )
-    val = get_close_matches(word, possibilities, n=n, cutoff=cutoff)
+    if isinstance(possibilities, SuggestionIndex):
+        val = possibilities.suggest(word, n=n, cutoff=cutoff)
+    else:
+        val = get_close_matches(word, possibilities, n=n, cutoff=cutoff)
     if val:
         embed.description += "\nHowever, perhaps you meant...\n" + "\n".join(val)
     return embed
@@ -384,21 +488,30 @@ def parse_alias(alias, *, split=True):
     return aliases
 
 
-def normalize_alias(alias, message=""):
-    aliases = parse_alias(alias)
-    contents = parse_alias(message, split=False)
+@functools.lru_cache(maxsize=1024)
+def compile_alias(alias: str) -> typing.Tuple[str, ...]:
+    """
+    Parses the steps of an alias.
+
+    The steps are cached by alias value, so an alias is only parsed
+    again once it changes.
+    """
+    return tuple(parse_alias(alias))
 
-    final_aliases = []
-    for a, content in zip_longest(aliases, contents):
-        if a is None:
-            break
 
-        if content:
-            final_aliases.append(f"{a} {content}")
-        else:
-            final_aliases.append(a)
+def apply_alias_args(steps: typing.Sequence[str], message: str = "") -> typing.List[str]:
+    """Appends the arguments an alias was invoked with to its first step."""
+    if not steps:
+        return []
 
-    return final_aliases
+    contents = parse_alias(message, split=False) if message else []
+    if contents and contents[0]:
+        return [f"{steps[0]} {contents[0]}", *steps[1:]]
+    return list(steps)
+
+
+def normalize_alias(alias, message=""):
+    return apply_alias_args(compile_alias(alias), message)
 
 
 def format_description(i, names):
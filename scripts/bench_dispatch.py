@@ -0,0 +1,116 @@
+"""
+Measures the per-message overhead of get_contexts and process_commands for
+messages sent in a thread channel, along with the number of thread lookups,
+contexts and prefix resolutions per message.
+
+The bot, its config and its API are stubbed, the thread manager is the real one
+with a single cached thread. Pass the path of another checkout to compare it
+with this one:
+
+    python scripts/bench_dispatch.py [repo path]
+"""
+
+import asyncio
+import collections
+import os
+import sys
+import time
+import types
+
+REPO_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_PATH)
+
+import discord  # noqa: E402
+from discord.ext import commands  # noqa: E402
+
+import bot as bot_module  # noqa: E402
+from core.thread import ThreadManager  # noqa: E402
+
+ITERATIONS = 20_000
+RUNS = 7
+
+counts = collections.Counter()
+
+
+def counted(name, func):
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+ThreadManager.find = counted("threads.find", ThreadManager.find)
+commands.Context.__init__ = counted("Context", commands.Context.__init__)
+bot_module.ModmailBot.get_prefix = counted("get_prefix", bot_module.ModmailBot.get_prefix)
+
+
+class StubConfig(dict):
+    def get(self, key, default=None):
+        return super().get(key, default)
+
+
+class BenchBot(bot_module.ModmailBot):
+    prefix = "?"
+    user = types.SimpleNamespace(id=1, bot=True)
+    snippets = {}
+    aliases = {"multi": "echo one && echo two && echo three"}
+
+    def __init__(self):
+        # skips the setup of the client, only what dispatching a message needs
+        self.config = StubConfig()
+        self.all_commands = {}
+        self.threads = ThreadManager(self)
+        self._api = types.SimpleNamespace(append_log=self._append_log)
+
+    @property
+    def api(self):
+        return self._api
+
+    async def _append_log(self, *args, **kwargs):
+        pass
+
+
+def make_channel(channel_id, topic):
+    channel = discord.TextChannel.__new__(discord.TextChannel)
+    channel.id = channel_id
+    channel.topic = topic
+    return channel
+
+
+def make_message(channel, content):
+    author = types.SimpleNamespace(id=2, bot=False)
+    return types.SimpleNamespace(content=content, channel=channel, author=author, guild=None, _state=None)
+
+
+async def main():
+    bot = BenchBot()
+    channel = make_channel(10, "User ID: 3")
+    bot.threads.channel_cache[channel.id] = types.SimpleNamespace(id=3, channel=channel)
+
+    cases = {
+        "process_commands, plain thread message": (bot.process_commands, "hello there"),
+        "get_contexts, unknown command": (bot.get_contexts, "?nothing here"),
+        "get_contexts, 3-step alias": (bot.get_contexts, "?multi"),
+    }
+    for name, (func, content) in cases.items():
+        message = make_message(channel, content)
+        for _ in range(1000):
+            await func(message)
+
+        timings = []
+        for _ in range(RUNS):
+            start = time.process_time()
+            for _ in range(ITERATIONS):
+                await func(message)
+            timings.append((time.process_time() - start) / ITERATIONS * 1e6)
+        timings.sort()
+
+        counts.clear()
+        await func(message)
+        calls = ", ".join(f"{count} {name}" for name, count in sorted(counts.items()))
+        print(f"{name}: best {timings[0]:.2f} us, median {timings[RUNS // 2]:.2f} us, {calls}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())